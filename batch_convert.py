@@ -0,0 +1,80 @@
+# batch_convert.py
+from ingredient_database import INGREDIENT_DATABASE
+from units import CANONICAL_UNITS, canonical_unit, conversion_factor
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+UNIT_IDS = {unit: unit_id for unit_id, unit in enumerate(CANONICAL_UNITS)}
+
+
+def unit_id(unit):
+    """Return the factor-matrix column for a parsed unit, or -1 if it is unknown."""
+    return UNIT_IDS.get(canonical_unit(unit), -1)
+
+
+class BatchConverter:
+    """Convert many ingredients to grams in one vectorized operation.
+
+    A factor matrix of grams per unit is built once, one row per database
+    entry and one column per canonical unit. Cells that can't be converted
+    (e.g. "each" for flour) hold NaN. Each cell is the same factor the
+    scalar RecipeParser.convert_to_grams multiplies by, so results match it
+    exactly, with NaN where the scalar path returns None.
+    """
+
+    def __init__(self, ingredient_database=INGREDIENT_DATABASE):
+        if np is None:
+            raise ImportError("BatchConverter requires numpy (pip install numpy)")
+        self.ingredient_database = ingredient_database
+        factors = np.full((len(ingredient_database), len(CANONICAL_UNITS)), np.nan)
+        for row, item in enumerate(ingredient_database):
+            for column, unit in enumerate(CANONICAL_UNITS):
+                factor = conversion_factor(item, unit)
+                if factor is not None:
+                    factors[row, column] = factor
+        factors.setflags(write=False)
+        self.factors = factors
+
+    def convert(self, ingredient_ids, unit_ids, quantities):
+        """Return gram weights for parallel arrays of ingredient ids, unit ids and quantities.
+
+        Negative ids and NaN quantities mark entries that can't be converted;
+        their result is NaN.
+        """
+        ingredient_ids = np.asarray(ingredient_ids, dtype=np.intp)
+        unit_ids = np.asarray(unit_ids, dtype=np.intp)
+        quantities = np.asarray(quantities, dtype=np.float64)
+
+        valid = (ingredient_ids >= 0) & (unit_ids >= 0)
+        grams = np.full(quantities.shape, np.nan)
+        # np.round rounds half to even like the built-in round() used by the scalar path
+        grams[valid] = np.round(quantities[valid] * self.factors[ingredient_ids[valid], unit_ids[valid]])
+        return grams
+
+    def encode(self, parser, ingredients):
+        """Turn parsed ingredient dicts into (ingredient_ids, unit_ids, quantities) arrays.
+
+        Names are resolved with parser, which must use the same database.
+        """
+        count = len(ingredients)
+        ingredient_ids = np.full(count, -1, dtype=np.intp)
+        unit_ids = np.full(count, -1, dtype=np.intp)
+        quantities = np.full(count, np.nan)
+        for position, item in enumerate(ingredients):
+            if item.get("is_header", False) or item.get("quantity") is None:
+                continue
+            index = parser.resolve_ingredient_id(item["name"])
+            if index is None:
+                continue
+            ingredient_ids[position] = index
+            unit_ids[position] = unit_id(item["unit"])
+            quantities[position] = item["quantity"]
+        return ingredient_ids, unit_ids, quantities
+
+    def convert_items(self, parser, ingredients):
+        """Return gram weights for parsed ingredient dicts, None where unknown."""
+        grams = self.convert(*self.encode(parser, ingredients))
+        return [None if np.isnan(weight) else int(weight) for weight in grams.tolist()]
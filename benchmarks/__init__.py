@@ -0,0 +1,4 @@
+"""Performance measurement scripts for the Precision Baking parser.
+
+Run them from the repository root, e.g. ``python -m benchmarks.startup``.
+"""
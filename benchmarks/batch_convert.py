@@ -0,0 +1,64 @@
+"""Compare vectorized BatchConverter against per-item convert_to_grams.
+
+    python -m benchmarks.batch_convert --items 100000
+
+Requires numpy. Fails if any result differs from the scalar path.
+"""
+import argparse
+import random
+import time
+
+import numpy as np
+
+from batch_convert import BatchConverter
+from recipe_parser import RecipeParser
+from units import UNIT_ALIASES
+
+
+def random_items(count, seed=0):
+    rng = random.Random(seed)
+    names = ["all-purpose flour", "white sugar", "butter", "milk", "eggs", "egg yolks",
+             "salt", "honey", "pecans", "cocoa powder"]
+    units = list(UNIT_ALIASES) + [None, "smidgen"]
+    return [{
+        "original": "",
+        "quantity": rng.choice([0.25, 0.5, 1.0, 1.5, 2.0, 3.0, 0.125, 2.5]),
+        "unit": rng.choice(units),
+        "name": rng.choice(names),
+        "is_header": rng.random() < 0.05,
+    } for _ in range(count)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    items = random_items(args.items)
+    recipe_parser = RecipeParser(regex_only=True)
+    converter = BatchConverter(recipe_parser.ingredient_database)
+
+    start = time.perf_counter()
+    scalar = [recipe_parser.convert_to_grams(item) for item in items]
+    scalar_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    arrays = converter.encode(recipe_parser, items)
+    encode_time = time.perf_counter() - start
+    start = time.perf_counter()
+    grams = converter.convert(*arrays)
+    convert_time = time.perf_counter() - start
+
+    vectorized = converter.convert_items(recipe_parser, items)
+    mismatches = sum(1 for a, b in zip(scalar, vectorized) if a != b)
+    if mismatches:
+        raise SystemExit(f"{mismatches} results differ from the scalar path")
+
+    print(f"items: {len(items)}  converted: {int((~np.isnan(grams)).sum())}")
+    print(f"scalar convert_to_grams: {scalar_time * 1000:9.1f} ms")
+    print(f"encode (name/unit ids):  {encode_time * 1000:9.1f} ms")
+    print(f"vectorized convert:      {convert_time * 1000:9.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
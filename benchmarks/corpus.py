@@ -0,0 +1,95 @@
+"""Seeded generator of realistic synthetic recipe corpora.
+
+Lines are drawn from a weighted mix of kinds:
+
+    regex     "2 cups all-purpose flour" - parsed by the regex path
+    fraction  "1 1/2 cups bread flour" - mixed numbers and fractions
+    nlp       "Butter: 1/2 cup, softened" - not parsed by the line grammar
+    unknown   "1 cup chopped pecans" - ingredient missing from the database
+    header    "For the frosting" - section headers
+
+Every line comes with the quantity, unit and ingredient it was built from,
+so the corpus doubles as labeled data. Generation is streaming, so corpora
+of millions of lines never need to be held in memory:
+
+    python -m benchmarks.corpus --lines 1000000 -o corpus.txt
+"""
+import argparse
+import random
+
+from ingredient_database import INGREDIENT_DATABASE
+
+DEFAULT_MIX = {"regex": 0.45, "fraction": 0.15, "nlp": 0.2, "unknown": 0.1, "header": 0.1}
+
+UNITS = ["cup", "cups", "tablespoon", "tablespoons", "tbsp", "teaspoon", "teaspoons", "tsp",
+         "oz", "ounces", "lb", "g", "grams", "ml"]
+UNKNOWN_INGREDIENTS = ["pecans", "vanilla extract", "dried cranberries", "lemon zest",
+                       "buttermilk", "molasses", "pistachios", "cornstarch"]
+HEADERS = ["For the frosting", "Dough", "Filling", "Topping", "For the glaze",
+           "Dry ingredients", "Wet ingredients", "Crust"]
+NOTES = ["softened", "melted", "sifted", "packed", "chopped", "at room temperature"]
+QUANTITIES = [("1", 1.0), ("2", 2.0), ("3", 3.0), ("4", 4.0), ("0.5", 0.5), ("1.5", 1.5)]
+FRACTIONS = [("1/2", 0.5), ("1/4", 0.25), ("3/4", 0.75), ("1/3", 1 / 3), ("1 1/2", 1.5),
+             ("2 1/4", 2.25), ("1 1/3", 4 / 3)]
+
+
+def iter_labeled_lines(count, seed=0, mix=None):
+    """Yield (kind, line, truth) for count lines; truth holds quantity, unit and name."""
+    rng = random.Random(seed)
+    mix = mix or DEFAULT_MIX
+    kinds = list(mix)
+    weights = [mix[kind] for kind in kinds]
+    names = [item["name"] for item in INGREDIENT_DATABASE]
+
+    for _ in range(count):
+        kind = rng.choices(kinds, weights)[0]
+        if kind == "header":
+            yield kind, rng.choice(HEADERS), {"quantity": None, "unit": None, "name": None}
+            continue
+
+        quantity_text, quantity = rng.choice(FRACTIONS if kind == "fraction" else QUANTITIES)
+        unit = rng.choice(UNITS)
+        name = rng.choice(UNKNOWN_INGREDIENTS if kind == "unknown" else names)
+        truth = {"quantity": quantity, "unit": unit, "name": name}
+
+        if kind == "nlp":
+            template = rng.choice([
+                "{Name}: {q} {unit}, {note}",
+                "{Name} - about {q} {unit}",
+                "{name} ({q} {unit})",
+                "{q} {unit} of {name}, {note}",
+            ])
+            line = template.format(Name=name.capitalize(), name=name, q=quantity_text, unit=unit,
+                                   note=rng.choice(NOTES))
+        else:
+            line = f"{quantity_text} {unit} {name}"
+            if rng.random() < 0.2:
+                line += f", {rng.choice(NOTES)}"
+        yield kind, line, truth
+
+
+def iter_lines(count, seed=0, mix=None):
+    """Yield count synthetic recipe lines."""
+    for _, line, _ in iter_labeled_lines(count, seed, mix):
+        yield line
+
+
+def write_corpus(path, count, seed=0, mix=None):
+    """Write count synthetic lines to path, one per line."""
+    with open(path, "w", encoding="utf-8") as file:
+        for line in iter_lines(count, seed, mix):
+            file.write(line)
+            file.write("\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", required=True)
+    args = parser.parse_args(argv)
+    write_corpus(args.output, args.lines, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Time fuzzy ingredient lookup against a full scan as the database grows.
+
+    python -m benchmarks.fuzzy --sizes 33 1000 10000 100000
+
+Queries are database names with one random letter dropped, doubled or
+swapped. For each size the trigram index's top_k is compared with scoring
+every name in turn; both must return the same best candidate.
+"""
+import argparse
+import random
+import sys
+import time
+
+from benchmarks.matcher import synthetic_database
+from fuzzy_index import MIN_SCORE, FuzzyIndex, trigrams
+from ingredient_database import INGREDIENT_DATABASE
+from ingredient_matcher import normalize_name
+
+
+def misspell(name, rng):
+    """Return name with one letter dropped, doubled or swapped with its neighbour."""
+    positions = [i for i, char in enumerate(name) if char.isalpha()]
+    i = rng.choice(positions)
+    edit = rng.choice(("drop", "double", "swap"))
+    if edit == "drop":
+        return name[:i] + name[i + 1:]
+    if edit == "double" or i + 1 >= len(name):
+        return name[:i] + name[i] + name[i:]
+    return name[:i] + name[i + 1] + name[i] + name[i + 2:]
+
+
+def full_scan(names, query, min_score):
+    """Score every name; the reference result for FuzzyIndex.top_k(query, 1)."""
+    query_grams = trigrams(query)
+    best = None
+    for index, name in enumerate(names):
+        grams = trigrams(name)
+        score = 2 * len(query_grams & grams) / (len(query_grams) + len(grams))
+        if score >= min_score and (best is None or score > best[1]):
+            best = (index, score)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[33, 1000, 10000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(1)
+    queries = [misspell(normalize_name(rng.choice(INGREDIENT_DATABASE)["name"]), rng)
+               for _ in range(args.queries)]
+    scan_queries = queries[:max(1, args.queries // 10)]
+    failed = False
+    print(f"{'entries':>8} {'build (ms)':>11} {'top_k (us)':>11} {'full scan (us)':>15} {'mismatches':>11}")
+    for size in args.sizes:
+        names = [normalize_name(item["name"]) for item in synthetic_database(size)]
+        start = time.perf_counter()
+        index = FuzzyIndex(names)
+        build = time.perf_counter() - start
+
+        start = time.perf_counter()
+        found = [index.top_k(query, 1, MIN_SCORE) for query in queries]
+        indexed = (time.perf_counter() - start) / len(queries)
+
+        start = time.perf_counter()
+        expected = [full_scan(names, query, MIN_SCORE) for query in scan_queries]
+        scanned = (time.perf_counter() - start) / len(scan_queries)
+
+        # Compare scores rather than indexes: equal-scoring names may tie
+        mismatches = sum((result[0][1] if result else None) != (best[1] if best else None)
+                         for result, best in zip(found, expected))
+        failed = failed or mismatches > 0
+        print(f"{size:>8} {build * 1000:>11.1f} {indexed * 1e6:>11.1f} {scanned * 1e6:>15.1f} {mismatches:>11}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Check that ingredient line parsing time grows linearly on adversarial input.
+
+    python -m benchmarks.grammar_adversarial
+    python -m benchmarks.grammar_adversarial --lengths 1000 10000 100000 --legacy
+
+Each case builds lines designed to provoke regex backtracking (long digit
+runs, unclosed parentheses, many words with no valid ending, ...) at several
+lengths and times line_grammar.parse_line on them. The per-character cost at
+the longest length must stay within --max-growth times the cost at the
+shortest, otherwise the run fails. --legacy also times the two-pattern
+parser this grammar replaced, at lengths small enough to finish.
+"""
+import argparse
+import re
+import sys
+import time
+
+from line_grammar import parse_line
+
+CASES = {
+    "digits": lambda n: "1" * n + "x",
+    "digits_spaces": lambda n: "1 " * n,
+    "decimal": lambda n: "1." + "1" * n + "!",
+    "fraction_run": lambda n: "1 " + "1/" * n,
+    "words_no_end": lambda n: "1 " + "a " * n + "!",
+    "commas": lambda n: "1 cup " + "a," * n,
+    "open_parens": lambda n: "1 cup " + "(" * n,
+    "nested_parens": lambda n: "1 cup " + "(a" * n + ")" * (n // 2),
+    "unit_prefixes": lambda n: "1 " + "tablespoo " * (n // 10),
+    "spaces": lambda n: "1" + " " * n + "x",
+    "of_run": lambda n: "1 cup " + "of " * (n // 3),
+}
+
+# The patterns _try_regex_parsing tried in turn before line_grammar
+LEGACY_PATTERNS = (r'^([\d/\.\s]+)\s+([\w\s]+?)\s+([\w\s,]+)$', r'^([\d/\.\s]+)\s+([\w\s,]+)$')
+
+
+def legacy_parse(line):
+    for pattern in LEGACY_PATTERNS:
+        if re.match(pattern, line):
+            return True
+    return False
+
+
+def time_line(func, line, min_seconds=0.02):
+    """Return the mean seconds per call of func(line), repeating until min_seconds."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        func(line)
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_seconds:
+            return elapsed / calls
+
+
+def run(func, lengths):
+    """Return {case: [(length, seconds), ...]} for func over every case and length."""
+    return {name: [(len(build(n)), time_line(func, build(n))) for n in lengths]
+            for name, build in CASES.items()}
+
+
+def report(title, timings, max_growth=None):
+    """Print timings and return the cases whose per-character cost grew too much."""
+    print(title)
+    print(f"{'case':<16} {'chars':>9} {'seconds':>12} {'ns/char':>9}")
+    failures = []
+    for name, points in timings.items():
+        for length, seconds in points:
+            print(f"{name:<16} {length:>9} {seconds:>12.6f} {seconds / length * 1e9:>9.1f}")
+        (first_len, first), (last_len, last) = points[0], points[-1]
+        growth = (last / last_len) / (first / first_len)
+        if max_growth is not None and growth > max_growth:
+            failures.append((name, growth))
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lengths", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--max-growth", type=float, default=3.0,
+                        help="allowed growth of per-character cost from the shortest to longest length")
+    parser.add_argument("--legacy", action="store_true",
+                        help="also time the replaced two-pattern parser")
+    parser.add_argument("--legacy-lengths", type=int, nargs="+", default=[50, 100, 200])
+    args = parser.parse_args(argv)
+
+    failures = report("line_grammar.parse_line", run(parse_line, args.lengths), args.max_growth)
+    if args.legacy:
+        print()
+        report("legacy two-pattern parser", run(legacy_parse, args.legacy_lengths))
+
+    for name, growth in failures:
+        print(f"FAIL {name}: per-character cost grew {growth:.1f}x", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,68 @@
+"""Compare memory per entry and lookup latency of IngredientTable vs a list of dicts.
+
+    python -m benchmarks.ingredient_table --entries 100000
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+
+from ingredient_table import IngredientTable
+from benchmarks.matcher import synthetic_database
+
+
+def measure_memory(build):
+    """Return (object, bytes allocated while building it)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def per_lookup(func, keys):
+    start = time.perf_counter()
+    for key in keys:
+        func(key)
+    return (time.perf_counter() - start) / len(keys)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--lookups", type=int, default=10000)
+    args = parser.parse_args(argv)
+
+    source = synthetic_database(args.entries)
+    # Rebuild the dicts inside the measurement so both sides own their data
+    dicts, dict_bytes = measure_memory(lambda: [dict(item, name=str(item["name"]) + "") for item in source])
+    table, table_bytes = measure_memory(lambda: IngredientTable.from_database(source))
+
+    rng = random.Random(0)
+    ids = [rng.randrange(len(table)) for _ in range(args.lookups)]
+    names = [source[index]["name"] for index in ids]
+    scan_names = names[:max(1, args.lookups // 500)]
+
+    def scan(name):
+        for item in dicts:
+            if item["name"].lower() == name:
+                return item
+        return None
+
+    print(f"entries: {len(table)}")
+    print(f"list of dicts:   {dict_bytes / len(table):8.1f} bytes/entry")
+    print(f"IngredientTable: {table_bytes / len(table):8.1f} bytes/entry")
+    print(f"lookup by id    list: {per_lookup(dicts.__getitem__, ids) * 1e9:10.0f} ns"
+          f"   table: {per_lookup(table.__getitem__, ids) * 1e9:10.0f} ns")
+    print(f"lookup by name  scan: {per_lookup(scan, scan_names) * 1e9:10.0f} ns"
+          f"   table: {per_lookup(table.lookup, names) * 1e9:10.0f} ns")
+    print(f"field read      dict: {per_lookup(lambda i: dicts[i]['gram_per_cup'], ids) * 1e9:10.0f} ns"
+          f"   table: {per_lookup(lambda i: table.columns['gram_per_cup'][i], ids) * 1e9:10.0f} ns")
+
+
+if __name__ == "__main__":
+    main()
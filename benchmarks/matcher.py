@@ -0,0 +1,67 @@
+"""Show that ingredient matching cost per line does not grow with database size.
+
+    python -m benchmarks.matcher --sizes 33 1000 10000 50000
+"""
+import argparse
+import random
+import string
+import time
+
+from ingredient_database import INGREDIENT_DATABASE
+from ingredient_matcher import IngredientMatcher
+
+LINES = [
+    "2 cups all-purpose flour",
+    "1/2 cup white sugar, packed",
+    "1 teaspoon pure vanilla extract",
+    "3 large egg whites",
+    "1 cup chopped pecans",
+]
+
+
+def synthetic_database(size, seed=0):
+    """Return INGREDIENT_DATABASE padded with random made-up ingredients."""
+    rng = random.Random(seed)
+    database = list(INGREDIENT_DATABASE)
+    while len(database) < size:
+        words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9)))
+                 for _ in range(rng.randint(1, 3))]
+        database.append(dict(INGREDIENT_DATABASE[0], name=" ".join(words)))
+    return database
+
+
+def linear_scan(database, name):
+    """The previous matching loop, kept for comparison."""
+    for item in database:
+        if name.lower() in item["name"].lower() or item["name"].lower() in name.lower():
+            return item
+    return None
+
+
+def time_per_line(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for line in LINES:
+            func(line)
+    return (time.perf_counter() - start) / (repeat * len(LINES))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[33, 1000, 10000])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'entries':>8} {'build (ms)':>11} {'matcher (us/line)':>18} {'linear scan (us/line)':>22}")
+    for size in args.sizes:
+        database = synthetic_database(size)
+        start = time.perf_counter()
+        matcher = IngredientMatcher(database)
+        build = time.perf_counter() - start
+        matched = time_per_line(matcher.match, args.repeat)
+        scanned = time_per_line(lambda line: linear_scan(database, line), max(1, args.repeat // 20))
+        print(f"{size:>8} {build * 1000:>11.1f} {matched * 1e6:>18.1f} {scanned * 1e6:>22.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Compare NLP-fallback throughput of nlp.pipe batching against one nlp() call per line.
+
+    python -m benchmarks.nlp_batching --lines 2000 --batch-sizes 16 64 256
+
+Requires spaCy and en_core_web_sm.
+"""
+import argparse
+import random
+import time
+
+from recipe_parser import RecipeParser, get_nlp
+
+# Lines the regexes cannot fully parse, so every one takes the NLP fallback
+MESSY_LINES = [
+    "Flour - about 2 cups, sifted",
+    "sugar (1 cup)",
+    "a pinch of salt",
+    "Butter: 1/2 cup softened",
+    "milk, 1 cup warm",
+    "2 large eggs beaten",
+    "vanilla extract to taste",
+    "Honey — 3 tbsp",
+]
+
+
+def one_at_a_time(parser, lines):
+    return [parser._try_nlp_parsing(line) for line in lines]
+
+
+def throughput(func, lines):
+    start = time.perf_counter()
+    results = func(lines)
+    elapsed = time.perf_counter() - start
+    return results, len(lines) / elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[16, 64, 256])
+    parser.add_argument("--n-process", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    lines = [rng.choice(MESSY_LINES) for _ in range(args.lines)]
+    get_nlp()  # load the model outside the timed sections
+
+    recipe_parser = RecipeParser(regex_only=False)
+    baseline, baseline_rate = throughput(lambda batch: one_at_a_time(recipe_parser, batch), lines)
+    print(f"{'one at a time':>22}: {baseline_rate:10.0f} lines/s")
+
+    for batch_size in args.batch_sizes:
+        recipe_parser = RecipeParser(regex_only=False, nlp_batch_size=batch_size,
+                                     nlp_n_process=args.n_process)
+        results, rate = throughput(recipe_parser._try_nlp_parsing_batch, lines)
+        if results != baseline:
+            raise SystemExit(f"batch_size={batch_size} results differ from the one-at-a-time loop")
+        print(f"{'pipe batch_size=' + str(batch_size):>22}: {rate:10.0f} lines/s "
+              f"({rate / baseline_rate:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""Time rescaling a converted recipe against parsing and converting it again.
+
+    python -m benchmarks.scaling --lines 500 --multiplier 12
+
+Re-conversion runs on an uncached parser, as after editing the recipe
+text. Fails if any scaled weight differs from converting the scaled
+quantity.
+"""
+import argparse
+import sys
+import time
+
+from benchmarks.corpus import iter_lines
+from recipe_parser import RecipeParser
+
+
+def per_call(func, repeat):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=500)
+    parser.add_argument("--multiplier", type=float, default=12)
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--regex-only", action="store_true")
+    args = parser.parse_args(argv)
+
+    text = "\n".join(iter_lines(args.lines, seed=0))
+    lines = [line.strip() for line in text.split("\n") if line.strip()]
+    recipe_parser = RecipeParser(regex_only=args.regex_only or None)
+    recipe = recipe_parser.scalable_recipe(text)
+    uncached = RecipeParser(regex_only=recipe_parser.regex_only, line_cache_size=0, recipe_cache_size=0,
+                            name_cache_size=0)
+
+    def reconvert():
+        results = uncached.parse_lines(lines)
+        for item in results:
+            if item.get("quantity") is not None and not item.get("is_header", False):
+                item["quantity"] *= args.multiplier
+            item["gram_weight"] = uncached.convert_to_grams(item)
+        return results
+
+    expected = [item["gram_weight"] for item in reconvert()]
+    mismatches = sum(a != b for a, b in zip(expected, recipe.gram_weights(args.multiplier)))
+
+    rows = [
+        ("re-parse and convert", per_call(reconvert, max(1, args.repeat // 20))),
+        ("gram_weights", per_call(lambda: recipe.gram_weights(args.multiplier), args.repeat)),
+        ("total_weight", per_call(lambda: recipe.total_weight(args.multiplier), args.repeat)),
+        ("scale", per_call(lambda: recipe.scale(args.multiplier), args.repeat)),
+        ("multiplier_for_total", per_call(lambda: recipe.multiplier_for_total(10000), args.repeat)),
+    ]
+    print(f"{len(recipe)} lines, x{args.multiplier:g}, {mismatches} mismatches")
+    for label, seconds in rows:
+        print(f"{label:<22} {seconds * 1e6:>12.1f} us")
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
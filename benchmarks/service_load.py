@@ -0,0 +1,112 @@
+"""Load-test conversion_service and report p50/p99 latency.
+
+    python -m benchmarks.service_load --start --requests 2000 --concurrency 64
+
+With --start a regex-only service is launched on --port for the duration of
+the test; otherwise an already running service is targeted.
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+RECIPES = [
+    "2 cups all-purpose flour\n1 cup white sugar\n2 eggs",
+    "1 teaspoon baking powder\n1/2 teaspoon salt\n1 cup milk",
+    "1/4 cup butter, melted\n3 tablespoons honey",
+    "Frosting\n2 cups powdered sugar\n1/2 cup butter",
+]
+
+
+async def client(host, port, count, recipes, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        for _ in range(count):
+            body = json.dumps({"text": random.choice(recipes)}).encode("utf-8")
+            request = (f"POST /convert HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                       f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+            start = time.perf_counter()
+            writer.write(request)
+            await writer.drain()
+            status_line = await reader.readline()
+            length = 0
+            while True:
+                line = await reader.readline()
+                if line in (b"\r\n", b""):
+                    break
+                name, _, value = line.decode("latin-1").partition(":")
+                if name.lower() == "content-length":
+                    length = int(value)
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+            status = int(status_line.split()[1])
+            statuses[status] = statuses.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+async def run_load(host, port, requests, concurrency):
+    latencies, statuses = [], {}
+    per_client = [requests // concurrency + (1 if i < requests % concurrency else 0)
+                  for i in range(concurrency)]
+    start = time.perf_counter()
+    await asyncio.gather(*(client(host, port, count, RECIPES, latencies, statuses)
+                           for count in per_client if count))
+    return time.perf_counter() - start, latencies, statuses
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+async def wait_for_port(host, port, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            _, writer = await asyncio.open_connection(host, port)
+            writer.close()
+            return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.1)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--start", action="store_true", help="launch a regex-only service first")
+    parser.add_argument("--window-ms", type=float, default=10.0, help="batch window for --start")
+    args = parser.parse_args(argv)
+
+    server = None
+    if args.start:
+        server = subprocess.Popen([sys.executable, "conversion_service.py", "--regex-only",
+                                   "--host", args.host, "--port", str(args.port),
+                                   "--window-ms", str(args.window_ms)], stdout=subprocess.DEVNULL)
+    try:
+        asyncio.run(wait_for_port(args.host, args.port))
+        elapsed, latencies, statuses = asyncio.run(
+            run_load(args.host, args.port, args.requests, args.concurrency))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print(f"requests: {len(latencies)} in {elapsed:.2f}s ({len(latencies) / elapsed:.0f} req/s)")
+    print(f"status codes: {statuses}")
+    print(f"latency p50: {percentile(latencies, 0.50) * 1000:.1f} ms  "
+          f"p99: {percentile(latencies, 0.99) * 1000:.1f} ms  "
+          f"mean: {statistics.mean(latencies) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""Compare per-worker memory of pickled ingredient databases against shared-memory tables.
+
+    python -m benchmarks.shared_tables --entries 100000 --workers 1 2 4 8
+
+For each pool size, starts spawned workers that either receive the
+database pickled (each building its own parser on it) or attach to one
+SharedTables block, has every worker resolve the same ingredient names, and
+reports their mean resident and private memory. Fails if the two disagree
+on any name or a shared block is left behind.
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+
+from benchmarks.corpus import iter_labeled_lines
+from benchmarks.matcher import synthetic_database
+from shared_tables import SharedTables, attach_table, process_memory
+
+_parser = None
+
+
+def _init_copy(database):
+    global _parser
+    from recipe_parser import RecipeParser
+    _parser = RecipeParser(ingredient_database=database, regex_only=True)
+
+
+def _init_shared(name):
+    global _parser
+    from recipe_parser import RecipeParser
+    _parser = RecipeParser(ingredient_database=attach_table(name), regex_only=True)
+
+
+def _resolve(names):
+    # Held briefly so each worker of the pool takes one batch
+    time.sleep(0.2)
+    return os.getpid(), [_parser._match_ingredient_id(name) for name in names], process_memory()
+
+
+def run(context, workers, initializer, initargs, names):
+    """Return (ids resolved, [memory of each worker])."""
+    with context.Pool(workers, initializer=initializer, initargs=initargs) as pool:
+        results = pool.map(_resolve, [names] * workers, chunksize=1)
+    memory = {pid: reading for pid, _, reading in results}
+    return results[0][1], list(memory.values())
+
+
+def mean_mib(readings, key):
+    values = [reading[key] for reading in readings if key in reading]
+    return sum(values) / len(values) / 1024 / 1024 if values else 0.0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--names", type=int, default=2000, help="names each worker resolves")
+    args = parser.parse_args(argv)
+
+    context = multiprocessing.get_context("spawn")
+    database = synthetic_database(args.entries)
+    names = [truth["name"] for _, _, truth in iter_labeled_lines(args.names) if truth["name"]]
+    mismatches = 0
+    print(f"{args.entries} entries; mean per worker")
+    print(f"{'workers':>7} {'copy MiB':>9} {'private':>8} {'shared MiB':>11} {'private':>8}")
+    with SharedTables.from_database(database) as shared:
+        print(f"shared block: {shared.size / 1024 / 1024:.1f} MiB")
+        for workers in args.workers:
+            copy_ids, copy_memory = run(context, workers, _init_copy, (database,), names)
+            shared_ids, shared_memory = run(context, workers, _init_shared, (shared.name,), names)
+            mismatches += sum(a != b for a, b in zip(copy_ids, shared_ids))
+            print(f"{workers:>7} {mean_mib(copy_memory, 'rss'):>9.1f} {mean_mib(copy_memory, 'private'):>8.1f} "
+                  f"{mean_mib(shared_memory, 'rss'):>11.1f} {mean_mib(shared_memory, 'private'):>8.1f}")
+        block = shared.name
+    leaked = os.path.exists(os.path.join("/dev/shm", block.lstrip("/")))
+    print(f"{mismatches} mismatches, block {'left behind' if leaked else 'unlinked'}")
+    return 1 if mismatches or leaked else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,106 @@
+"""Compare startup with a binary ingredient snapshot against a Python-literal database.
+
+    python -m benchmarks.snapshot --entries 100000
+
+Writes a synthetic database both as a Python module (like
+ingredient_database.py) and as a snapshot, then measures time and resident
+memory for importing the module and building a RecipeParser on it, against
+loading the snapshot and building a RecipeParser on that. Also checks that
+both parsers resolve the same ingredient names.
+"""
+import argparse
+import gc
+import importlib.util
+import os
+import pprint
+import random
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import iter_labeled_lines
+from benchmarks.matcher import synthetic_database
+from ingredient_snapshot import load_snapshot, write_snapshot
+from recipe_parser import RecipeParser
+
+
+def import_module_from(path):
+    spec = importlib.util.spec_from_file_location("synthetic_ingredient_database", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.INGREDIENT_DATABASE
+
+
+def rss_bytes():
+    """Return the resident set size of this process (Linux), or 0 where unavailable."""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        return 0
+
+
+def measure(build):
+    """Return (result, seconds, resident memory added) for build().
+
+    Memory is measured as RSS rather than with tracemalloc, which makes
+    compiling a large literal take minutes.
+    """
+    gc.collect()
+    before = rss_bytes()
+    start = time.perf_counter()
+    result = build()
+    seconds = time.perf_counter() - start
+    return result, seconds, rss_bytes() - before
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=100000)
+    parser.add_argument("--names", type=int, default=20000, help="names resolved by both parsers")
+    args = parser.parse_args(argv)
+
+    database = synthetic_database(args.entries)
+    with tempfile.TemporaryDirectory() as tmp:
+        module_path = os.path.join(tmp, "synthetic_ingredient_database.py")
+        with open(module_path, "w", encoding="utf-8") as file:
+            file.write("INGREDIENT_DATABASE = " + pprint.pformat(database) + "\n")
+        snapshot_path = os.path.join(tmp, "ingredients.snap")
+        start = time.perf_counter()
+        size = write_snapshot(snapshot_path, database)
+        print(f"snapshot: {size / 1024 / 1024:.1f} MiB, built in {time.perf_counter() - start:.2f}s")
+
+        literal, literal_seconds, literal_bytes = measure(lambda: import_module_from(module_path))
+        _, literal_parser_seconds, literal_parser_bytes = measure(
+            lambda: RecipeParser(ingredient_database=literal, regex_only=True))
+        table, snapshot_seconds, snapshot_bytes = measure(lambda: load_snapshot(snapshot_path))
+        _, snapshot_parser_seconds, snapshot_parser_bytes = measure(
+            lambda: RecipeParser(ingredient_database=table, regex_only=True))
+
+        print(f"{'':<28} {'seconds':>9} {'MiB':>8}")
+        for label, seconds, allocated in (
+                ("import Python literal", literal_seconds, literal_bytes),
+                ("  + RecipeParser", literal_parser_seconds, literal_parser_bytes),
+                ("load snapshot (mmap)", snapshot_seconds, snapshot_bytes),
+                ("  + RecipeParser", snapshot_parser_seconds, snapshot_parser_bytes)):
+            print(f"{label:<28} {seconds:>9.4f} {allocated / 1024 / 1024:>8.2f}")
+
+        rng = random.Random(1)
+        names = [truth["name"] for _, _, truth in iter_labeled_lines(args.names // 2) if truth["name"]]
+        names += [rng.choice(database)["name"] for _ in range(args.names - len(names))]
+        literal_parser = RecipeParser(ingredient_database=literal, regex_only=True, name_cache_size=0)
+        snapshot_parser = RecipeParser(ingredient_database=table, regex_only=True, name_cache_size=0)
+        timings = []
+        for resolver in (literal_parser, snapshot_parser):
+            start = time.perf_counter()
+            resolved = [resolver.resolve_ingredient_id(name) for name in names]
+            timings.append((resolved, (time.perf_counter() - start) / len(names)))
+        mismatches = sum(a != b for a, b in zip(timings[0][0], timings[1][0]))
+        print(f"resolve_ingredient_id: {timings[0][1] * 1e6:.1f}us (dicts) "
+              f"vs {timings[1][1] * 1e6:.1f}us (snapshot), {mismatches} mismatches")
+        del table, snapshot_parser
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
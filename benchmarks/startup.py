@@ -0,0 +1,79 @@
+"""Report cold-start import time and memory of recipe_parser.
+
+Each measurement runs in a fresh interpreter so nothing is already imported:
+
+    python -m benchmarks.startup --regex-only --budget-ms 200 --budget-mb 60
+
+Exits with status 1 when a budget is exceeded.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in the child interpreter; prints a JSON report on its last line.
+PROBE = """
+import json, resource, sys, time
+start = time.perf_counter()
+import recipe_parser
+import_seconds = time.perf_counter() - start
+parser = recipe_parser.RecipeParser()
+start = time.perf_counter()
+for item in parser.parse_recipe_text("2 cups all-purpose flour\\n1 teaspoon salt\\n2 eggs"):
+    parser.convert_to_grams(item)
+first_parse_seconds = time.perf_counter() - start
+rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+if sys.platform == "darwin":
+    rss_kb //= 1024
+print(json.dumps({
+    "import_ms": round(import_seconds * 1000, 2),
+    "first_parse_ms": round(first_parse_seconds * 1000, 2),
+    "max_rss_mb": round(rss_kb / 1024, 1),
+    "backends_loaded": recipe_parser.loaded_backends(),
+}))
+"""
+
+
+def measure(regex_only):
+    env = dict(os.environ)
+    if regex_only:
+        env["PRECISION_BAKING_REGEX_ONLY"] = "1"
+    else:
+        env.pop("PRECISION_BAKING_REGEX_ONLY", None)
+    proc = subprocess.run([sys.executable, "-c", PROBE], cwd=ROOT, env=env,
+                          capture_output=True, text=True)
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip() or "probe failed")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--regex-only", action="store_true",
+                        help="measure with PRECISION_BAKING_REGEX_ONLY=1")
+    parser.add_argument("--budget-ms", type=float, help="maximum import time in milliseconds")
+    parser.add_argument("--budget-mb", type=float, help="maximum resident set size in MB")
+    args = parser.parse_args(argv)
+
+    report = measure(args.regex_only)
+    report["mode"] = "regex-only" if args.regex_only else "full"
+    print(json.dumps(report, indent=2))
+
+    failed = False
+    if args.budget_ms is not None and report["import_ms"] > args.budget_ms:
+        print(f"Import time {report['import_ms']}ms exceeds budget of {args.budget_ms}ms")
+        failed = True
+    if args.budget_mb is not None and report["max_rss_mb"] > args.budget_mb:
+        print(f"RSS {report['max_rss_mb']}MB exceeds budget of {args.budget_mb}MB")
+        failed = True
+    if args.regex_only and report["backends_loaded"]:
+        print(f"Regex-only mode imported heavy backends: {', '.join(report['backends_loaded'])}")
+        failed = True
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,214 @@
+"""Benchmark the parsing and conversion pipeline on synthetic corpora.
+
+    python -m benchmarks.suite --sizes 10 1000 100000 -o bench.json
+    python -m benchmarks.suite --sizes 1000 100000 --baseline bench.json
+
+Times parse_recipe_text (with and without the parse caches), convert_to_grams,
+_try_regex_parsing against _try_nlp_parsing, and the GUI-free end-to-end path
+(streaming a corpus file through iter_parse into CSV rows). Peak memory is
+measured with tracemalloc for sizes up to --memory-limit. Each benchmark
+runs once to warm up and then --repeat times, keeping the fastest run.
+Results are written as JSON; with --baseline each result is compared to a
+saved run, except those too short (under --min-seconds) to time reliably.
+"""
+import argparse
+import importlib.util
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.corpus import write_corpus
+from recipe_export import RecipeExporter
+from recipe_parser import RecipeParser
+
+
+def timed(func, repeat=1, setup=None):
+    """Return (result, fastest seconds) for func() over one warm-up call and repeat timed calls.
+
+    With setup, each call is func(setup()) and setup isn't timed, e.g. to
+    start every run with a fresh parser.
+    """
+    result = None
+    best = None
+    for run in range(repeat + 1):
+        args = (setup(),) if setup is not None else ()
+        start = time.perf_counter()
+        result = func(*args)
+        seconds = time.perf_counter() - start
+        if run and (best is None or seconds < best):
+            best = seconds
+    return result, best
+
+
+def peak_memory(func):
+    """Return the peak bytes traced while running func()."""
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def nlp_available():
+    """Whether spaCy and en_core_web_sm are installed; never loads or downloads the model."""
+    if importlib.util.find_spec("spacy") is None:
+        return False
+    import spacy.util
+    return spacy.util.is_package("en_core_web_sm")
+
+
+def end_to_end(parser, path):
+    """Stream a corpus file through parsing, conversion and CSV formatting."""
+    with RecipeExporter(os.devnull, "csv") as exporter:
+        exporter.write_recipe(parser.iter_parse(path))
+
+
+def run_size(size, args, use_nlp):
+    results = []
+
+    def record(benchmark, seconds, lines, **extra):
+        results.append(dict({
+            "size": size,
+            "benchmark": benchmark,
+            "seconds": round(seconds, 6),
+            "lines_per_second": round(lines / seconds, 1) if seconds else None,
+        }, **extra))
+
+    def new_parser(**options):
+        return RecipeParser(regex_only=not use_nlp, **options)
+
+    repeat = args.repeat
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "corpus.txt")
+        write_corpus(path, size, args.seed)
+
+        if size <= args.in_memory_limit:
+            with open(path, encoding="utf-8") as file:
+                text = file.read()
+            lines = [line.strip() for line in text.split("\n") if line.strip()]
+
+            # A fresh parser per run, so every run starts with empty caches
+            parsed, seconds = timed(lambda parser: parser.parse_recipe_text(text), repeat, new_parser)
+            record("parse_recipe_text", seconds, size)
+
+            uncached = new_parser(line_cache_size=0, recipe_cache_size=0)
+            _, seconds = timed(lambda: uncached.parse_recipe_text(text), repeat)
+            record("parse_recipe_text_uncached", seconds, size)
+
+            parser = new_parser()
+            parser.parse_recipe_text(text)
+
+            _, seconds = timed(lambda: [parser.convert_to_grams(item) for item in parsed], repeat)
+            record("convert_to_grams", seconds, len(parsed))
+
+            _, seconds = timed(lambda: [parser._try_regex_parsing(line) for line in lines], repeat)
+            record("try_regex_parsing", seconds, len(lines))
+
+            if use_nlp:
+                sample = lines[:args.max_nlp_lines]
+                _, seconds = timed(lambda: [parser._try_nlp_parsing(line) for line in sample], repeat)
+                record("try_nlp_parsing", seconds, len(sample))
+
+            if size <= args.memory_limit:
+                results[0]["peak_bytes"] = peak_memory(lambda: new_parser().parse_recipe_text(text))
+            del text, lines, parsed
+
+        _, seconds = timed(lambda parser: end_to_end(parser, path), repeat, new_parser)
+        extra = {}
+        if size <= args.memory_limit:
+            extra["peak_bytes"] = peak_memory(lambda: end_to_end(new_parser(), path))
+        record("end_to_end", seconds, size, **extra)
+
+    return results
+
+
+def compare(results, baseline, threshold, min_seconds=0.0, repeat=None):
+    """Print each result's speed against the baseline; return the number of regressions.
+
+    Results where both runs took under min_seconds are shown but never
+    counted, since timer noise alone can exceed the threshold there.
+    """
+    baseline_repeat = baseline.get("meta", {}).get("repeat", 1)
+    if repeat is not None and baseline_repeat != repeat:
+        print(f"warning: baseline used --repeat {baseline_repeat}, this run {repeat}", file=sys.stderr)
+    previous = {(item["size"], item["benchmark"]): item for item in baseline["results"]}
+    regressions = 0
+    print(f"{'size':>9} {'benchmark':<28} {'seconds':>10} {'baseline':>10} {'change':>8}")
+    for item in results:
+        old = previous.get((item["size"], item["benchmark"]))
+        if old is None or not old["seconds"]:
+            continue
+        change = item["seconds"] / old["seconds"] - 1
+        flag = ""
+        if max(item["seconds"], old["seconds"]) < min_seconds:
+            flag = "  (too short)"
+        elif change > threshold:
+            regressions += 1
+            flag = "  REGRESSION"
+        print(f"{item['size']:>9} {item['benchmark']:<28} {item['seconds']:>10.4f} "
+              f"{old['seconds']:>10.4f} {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 100000])
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("-o", "--output", help="write results to this JSON file")
+    parser.add_argument("--baseline", help="compare against a previously saved JSON file")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown counted as a regression (default 0.10 = 10%%)")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timed runs per benchmark after a warm-up; the fastest is kept")
+    parser.add_argument("--min-seconds", type=float, default=0.005,
+                        help="results faster than this on both sides are not compared")
+    parser.add_argument("--regex-only", action="store_true", help="skip the spaCy benchmarks")
+    parser.add_argument("--max-nlp-lines", type=int, default=2000,
+                        help="lines timed through _try_nlp_parsing per size")
+    parser.add_argument("--in-memory-limit", type=int, default=1000000,
+                        help="larger sizes only run the streaming end-to-end benchmark")
+    parser.add_argument("--memory-limit", type=int, default=100000,
+                        help="largest size whose peak memory is traced")
+    args = parser.parse_args(argv)
+
+    use_nlp = not args.regex_only and nlp_available()
+    report = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+            "repeat": args.repeat,
+            "nlp": use_nlp,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": [],
+    }
+    for size in args.sizes:
+        size_results = run_size(size, args, use_nlp)
+        report["results"].extend(size_results)
+        for item in size_results:
+            print(f"{size:>9} {item['benchmark']:<28} {item['seconds']:>10.4f}s "
+                  f"{item['lines_per_second'] or 0:>12.0f} lines/s", file=sys.stderr)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2)
+    else:
+        print(json.dumps(report, indent=2))
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(report["results"], baseline, args.threshold, args.min_seconds, args.repeat)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
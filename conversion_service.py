@@ -0,0 +1,280 @@
+"""Local HTTP/JSON service exposing RecipeParser, using only the standard library.
+
+    python conversion_service.py --port 8765 --window-ms 10
+
+Endpoints (request bodies are {"text": "..."} or {"lines": [...]}):
+
+    POST /parse    parsed ingredients
+    POST /convert  parsed ingredients with gram_weight, plus total_weight
+    GET  /stats    batching, queue, cache and parse-stage counters
+    GET  /health
+
+Concurrent requests are coalesced into micro-batches: the first queued
+request opens a time window, everything arriving within it is parsed in a
+single parse_lines call (so the NLP fallback runs through nlp.pipe once),
+and results are split back per request. The queue is bounded; when it is
+full the service answers 503 instead of buffering without limit.
+"""
+import argparse
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import json
+import sys
+
+from recipe_parser import RecipeParser
+
+MAX_BODY_BYTES = 1024 * 1024
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    431: "Request Header Fields Too Large",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class ServiceError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class MicroBatcher:
+    """Queue conversion requests and process them in time-windowed batches."""
+
+    def __init__(self, parser, window=0.01, max_batch_lines=1024, max_queue=1000):
+        self.parser = parser
+        self.window = window
+        self.max_batch_lines = max_batch_lines
+        self.queue = asyncio.Queue(max_queue)
+        # RecipeParser isn't thread-safe; one worker thread keeps it serialized
+        # while keeping the event loop free to accept requests.
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.batches = 0
+        self.requests = 0
+        self.rejected = 0
+
+    def submit(self, lines, convert):
+        """Queue lines for processing and return a future for their results."""
+        future = asyncio.get_running_loop().create_future()
+        try:
+            self.queue.put_nowait((lines, convert, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise ServiceError(503, "conversion queue is full, retry later")
+        return future
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            line_count = len(batch[0][0])
+            deadline = loop.time() + self.window
+            while line_count < self.max_batch_lines:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = await asyncio.wait_for(self.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    break
+                batch.append(request)
+                line_count += len(request[0])
+
+            self.batches += 1
+            self.requests += len(batch)
+            try:
+                results = await loop.run_in_executor(self.executor, self._process, batch)
+            except Exception as e:
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, _, future), result in zip(batch, results):
+                if not future.done():  # the client may have gone away
+                    future.set_result(result)
+
+    def _process(self, batch):
+        """Parse every request's lines in one call and split the results back up."""
+        all_lines = [line for lines, _, _ in batch for line in lines]
+        parsed = self.parser.parse_lines(all_lines)
+        results = []
+        start = 0
+        for lines, convert, _ in batch:
+            items = parsed[start:start + len(lines)]
+            start += len(lines)
+            if convert:
+                for item in items:
+                    item["gram_weight"] = self.parser.convert_to_grams(item)
+            results.append(items)
+        return results
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "requests": self.requests,
+            "rejected": self.rejected,
+            "queued": self.queue.qsize(),
+            "mean_batch_requests": round(self.requests / self.batches, 2) if self.batches else 0,
+        }
+
+
+class ConversionService:
+    """Minimal HTTP/1.1 front end for a MicroBatcher."""
+
+    def __init__(self, batcher):
+        self.batcher = batcher
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                try:
+                    status, payload = 200, await self._dispatch(method, path, body)
+                except ServiceError as e:
+                    status, payload = e.status, {"error": str(e)}
+                except Exception as e:
+                    status, payload = 500, {"error": f"{type(e).__name__}: {e}"}
+                keep_alive = headers.get("connection", "").lower() != "close"
+                await self._write_response(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ServiceError as e:
+            # Malformed request framing; answer once and drop the connection
+            await self._write_response(writer, e.status, {"error": str(e)}, False)
+        finally:
+            writer.close()
+
+    async def _read_request(self, reader):
+        request_line = await self._read_line(reader, "request line")
+        if not request_line.strip():
+            return None
+        try:
+            method, path, _ = request_line.decode("latin-1").split(" ", 2)
+        except ValueError:
+            raise ServiceError(400, "malformed request line")
+
+        headers = {}
+        while True:
+            line = await self._read_line(reader, "header line")
+            if line in (b"\r\n", b"\n", b""):
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        try:
+            length = int(headers.get("content-length", 0) or 0)
+        except ValueError:
+            raise ServiceError(400, "invalid Content-Length")
+        if length > MAX_BODY_BYTES:
+            raise ServiceError(413, f"request body is limited to {MAX_BODY_BYTES} bytes")
+        body = await reader.readexactly(length) if length else b""
+        return method.upper(), path.split("?", 1)[0], headers, body
+
+    async def _read_line(self, reader, what):
+        try:
+            return await reader.readline()
+        except (ValueError, asyncio.LimitOverrunError):
+            # Longer than the reader's buffer limit (64 KiB by default)
+            raise ServiceError(431, f"{what} too long")
+
+    async def _dispatch(self, method, path, body):
+        if path == "/health":
+            return {"status": "ok"}
+        if path == "/stats":
+            # Read on the parser's worker thread, between batches, since
+            # parsing mutates the counters and caches being read
+            parser = self.batcher.parser
+            parser_stats = await asyncio.get_running_loop().run_in_executor(
+                self.batcher.executor, lambda: {"cache": parser.cache_stats(), "parser": parser.stats.snapshot()})
+            return {"batching": self.batcher.stats(), **parser_stats}
+        if path not in ("/parse", "/convert"):
+            raise ServiceError(404, f"no endpoint {path}")
+        if method != "POST":
+            raise ServiceError(405, f"{path} only accepts POST")
+
+        lines = self._request_lines(body)
+        convert = path == "/convert"
+        items = await self.batcher.submit(lines, convert)
+        payload = {"ingredients": items}
+        if convert:
+            payload["total_weight"] = sum(item.get("gram_weight") or 0 for item in items)
+        return payload
+
+    def _request_lines(self, body):
+        try:
+            request = json.loads(body or b"{}")
+        except ValueError:
+            raise ServiceError(400, "request body must be JSON")
+        if not isinstance(request, dict):
+            raise ServiceError(400, 'expected a JSON object with "text" or "lines"')
+        if isinstance(request.get("text"), str):
+            raw_lines = request["text"].split("\n")
+        elif isinstance(request.get("lines"), list):
+            raw_lines = request["lines"]
+            if not all(isinstance(line, str) for line in raw_lines):
+                raise ServiceError(400, '"lines" must be a list of strings')
+        else:
+            raise ServiceError(400, 'expected a JSON object with "text" or "lines"')
+        return [line.strip() for line in raw_lines if line.strip()]
+
+    async def _write_response(self, writer, status, payload, keep_alive):
+        body = json.dumps(payload).encode("utf-8")
+        head = [
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+
+async def serve(host="127.0.0.1", port=8765, window=0.01, max_batch_lines=1024, max_queue=1000,
+                regex_only=None):
+    parser = RecipeParser(regex_only=regex_only)
+    batcher = MicroBatcher(parser, window, max_batch_lines, max_queue)
+    service = ConversionService(batcher)
+    batch_task = asyncio.create_task(batcher.run())
+    server = await asyncio.start_server(service.handle_connection, host, port)
+    print(f"Serving conversions on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        batch_task.cancel()
+        batcher.executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--window-ms", type=float, default=10.0,
+                        help="how long a batch waits for more requests")
+    parser.add_argument("--max-batch-lines", type=int, default=1024)
+    parser.add_argument("--max-queue", type=int, default=1000,
+                        help="queued requests before answering 503")
+    parser.add_argument("--regex-only", action="store_true", help="never fall back to spaCy")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.window_ms / 1000, args.max_batch_lines,
+                          args.max_queue, args.regex_only or None))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
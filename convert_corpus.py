@@ -0,0 +1,223 @@
+"""Convert a corpus of recipes to gram weights without the GUI.
+
+The input is either a directory of .txt recipes (one recipe per file) or a
+JSONL file with one {"id": ..., "text": ...} object per line. Each recipe is
+written to OUTPUT/<n>-<id>.csv in the same format as "Save as CSV":
+
+    python convert_corpus.py recipes/ -o converted/ --workers 4
+    python convert_corpus.py recipes.jsonl -o converted/ --scaling 1 2 4 8
+    python convert_corpus.py recipes.jsonl -o converted/ --cache lines.sqlite
+    python convert_corpus.py recipes.jsonl -o converted/ --snapshot ingredients.snap
+    python convert_corpus.py recipes.jsonl -o converted/ --shared-tables --workers 8
+    python convert_corpus.py recipes.jsonl --export converted.jsonl.gz
+
+Recipes are converted in a process pool; every worker loads the parser (and
+spaCy) once. Output order is deterministic, and a recipe that fails is
+recorded in OUTPUT/errors.jsonl instead of stopping the run. With --cache,
+converted lines are kept in a SQLite file that every worker, and every
+later run, reads before parsing. With --snapshot, workers memory-map a
+compiled ingredient database (see ingredient_snapshot.py) instead of each
+building their own copy. With --shared-tables, the parent places that
+snapshot (or one built from INGREDIENT_DATABASE) in shared memory once and
+workers attach to it read-only; the block is unlinked when the run ends.
+The summary reports the largest worker's resident memory. With --export,
+all recipes are streamed into one CSV, TSV or JSONL file (gzipped if the
+name ends in .gz) instead, with failures in EXPORT.errors.jsonl.
+"""
+import argparse
+from contextlib import nullcontext
+import json
+import multiprocessing
+import os
+import re
+import sys
+import time
+
+from recipe_export import RecipeExporter, write_recipe_csv
+from shared_tables import SharedTables, attach_table, process_memory
+
+_parser = None
+_output_dir = None
+
+
+def iter_recipes(source):
+    """Yield (recipe_id, text) pairs from a directory of .txt files or a JSONL file."""
+    if os.path.isdir(source):
+        for filename in sorted(os.listdir(source)):
+            if filename.endswith(".txt"):
+                try:
+                    with open(os.path.join(source, filename), encoding="utf-8-sig") as file:
+                        text = file.read()
+                except (OSError, UnicodeDecodeError) as e:
+                    # Passed on so the worker reports it like any other bad recipe
+                    text = e
+                yield filename[:-len(".txt")], text
+        return
+
+    with open(source, encoding="utf-8") as file:
+        for number, line in enumerate(file, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                recipe_id = str(record.get("id", number))
+                text = record["text"]
+            except (ValueError, KeyError, AttributeError) as e:
+                # Passed on so the worker reports it like any other bad recipe
+                recipe_id, text = str(number), e
+            yield recipe_id, text
+
+
+def _init_worker(output_dir, regex_only, cache_path=None, cache_size=1000000, snapshot=None,
+                 shared_tables=None):
+    """Load the parser, and spaCy unless regex-only, once per worker process."""
+    global _parser, _output_dir
+    _output_dir = output_dir
+    from recipe_parser import RecipeParser, get_nlp
+    if shared_tables:
+        _parser = RecipeParser(ingredient_database=attach_table(shared_tables), regex_only=regex_only)
+    elif snapshot:
+        from ingredient_snapshot import load_snapshot
+        _parser = RecipeParser(ingredient_database=load_snapshot(snapshot), regex_only=regex_only)
+    else:
+        _parser = RecipeParser(regex_only=regex_only)
+    if cache_path:
+        _parser.open_persistent_cache(cache_path, cache_size)
+    if not _parser.regex_only:
+        get_nlp()
+
+
+def _convert_recipe(task):
+    """Convert one recipe; returns (index, recipe_id, line count, error, converted lines, memory).
+
+    The recipe is written to its own CSV here, unless there is no output
+    directory, in which case the converted lines go back to the parent.
+    memory is (worker pid, shared_tables.process_memory()) after the recipe.
+    """
+    index, (recipe_id, text) = task
+    converted = None
+    try:
+        if isinstance(text, Exception):
+            raise text
+        lines = [line.strip() for line in text.split('\n') if line.strip()]
+        converted = _parser.convert_lines(lines)
+        line_count = len(converted)
+        if _output_dir is not None:
+            write_recipe_csv(os.path.join(_output_dir, output_filename(index, recipe_id)), converted)
+            converted = None
+        error = None
+    except Exception as e:
+        line_count, error, converted = 0, f"{type(e).__name__}: {e}", None
+    return index, recipe_id, line_count, error, converted, (os.getpid(), process_memory())
+
+
+def output_filename(index, recipe_id):
+    safe_id = re.sub(r"[^\w.-]+", "_", recipe_id)[:80]
+    return f"{index:06d}-{safe_id}.csv"
+
+
+def convert_corpus(source, output_dir, workers=None, chunksize=16, regex_only=False, cache=None,
+                   cache_size=1000000, snapshot=None, export=None, shared_tables=False):
+    """Convert every recipe in source into output_dir, or one export file, and return a summary dict."""
+    if export is not None:
+        output_dir = None
+        errors_path = export + ".errors.jsonl"
+    else:
+        os.makedirs(output_dir, exist_ok=True)
+        errors_path = os.path.join(output_dir, "errors.jsonl")
+    workers = workers or os.cpu_count() or 1
+    summary = {"workers": workers, "recipes": 0, "lines": 0, "failed": 0}
+
+    start = time.perf_counter()
+    if shared_tables:
+        if snapshot:
+            shared = SharedTables.from_snapshot(snapshot)
+        else:
+            from ingredient_database import INGREDIENT_DATABASE
+            shared = SharedTables.from_database(INGREDIENT_DATABASE)
+        initargs = (output_dir, regex_only, cache, cache_size, None, shared.name)
+    else:
+        shared = nullcontext()
+        initargs = (output_dir, regex_only, cache, cache_size, snapshot)
+    exporter = RecipeExporter(export, recipe_column=True) if export is not None else nullcontext()
+    worker_memory = {}
+    # The shared block is unlinked only after the pool has shut down
+    with shared, multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool, \
+            open(errors_path, "w", encoding="utf-8") as errors, exporter:
+        # Workers write each recipe's CSV themselves; file names come from the
+        # input position, and imap hands back summaries in input order, so the
+        # output is the same whatever order the workers finish in. An export
+        # file is written here, in the same order, as results come back.
+        tasks = enumerate(iter_recipes(source))
+        for index, recipe_id, line_count, error, converted, (pid, memory) in pool.imap(
+                _convert_recipe, tasks, chunksize=chunksize):
+            worker_memory[pid] = memory
+            summary["recipes"] += 1
+            summary["lines"] += line_count
+            if error is not None:
+                summary["failed"] += 1
+                errors.write(json.dumps({"index": index, "id": recipe_id, "error": error}) + "\n")
+            elif export is not None:
+                exporter.write_recipe(converted, recipe_id)
+    if export is not None:
+        summary["total_weight"] = exporter.total_weight
+    elapsed = time.perf_counter() - start
+
+    # Each worker's most recent reading; "private" excludes pages shared with
+    # other processes, such as the shared tables and the snapshot file
+    for key in ("rss", "private"):
+        readings = [memory[key] for memory in worker_memory.values() if key in memory]
+        if readings:
+            summary[f"worker_{key}_mib"] = round(max(readings) / 1024 / 1024, 1)
+    summary["seconds"] = round(elapsed, 3)
+    summary["recipes_per_second"] = round(summary["recipes"] / elapsed, 1)
+    summary["lines_per_second"] = round(summary["lines"] / elapsed, 1)
+    return summary
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("source", help="directory of .txt recipes or a .jsonl file")
+    output = parser.add_mutually_exclusive_group(required=True)
+    output.add_argument("-o", "--output", help="directory for the CSV files")
+    output.add_argument("--export", metavar="PATH",
+                        help="write every recipe to one .csv, .tsv or .jsonl file (add .gz to compress)")
+    parser.add_argument("-w", "--workers", type=int, help="worker processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16, help="recipes sent to a worker at a time")
+    parser.add_argument("--regex-only", action="store_true", help="never fall back to spaCy")
+    parser.add_argument("--cache", metavar="PATH", help="SQLite file caching converted lines across runs")
+    parser.add_argument("--cache-size", type=int, default=1000000, help="most lines kept in the cache")
+    parser.add_argument("--snapshot", metavar="PATH",
+                        help="compiled ingredient database from ingredient_snapshot.py")
+    parser.add_argument("--shared-tables", action="store_true",
+                        help="put the ingredient snapshot in shared memory once for all workers")
+    parser.add_argument("--scaling", type=int, nargs="+", metavar="WORKERS",
+                        help="run once per worker count and report scaling efficiency")
+    args = parser.parse_args(argv)
+
+    if not args.scaling:
+        summary = convert_corpus(args.source, args.output, args.workers, args.chunksize, args.regex_only,
+                                 args.cache, args.cache_size, args.snapshot, args.export,
+                                 args.shared_tables)
+        print(json.dumps(summary, indent=2))
+        return 1 if summary["failed"] else 0
+
+    base = None
+    print(f"{'workers':>7} {'seconds':>9} {'recipes/s':>10} {'lines/s':>10} {'efficiency':>10} "
+          f"{'worker MiB':>10} {'private':>8}")
+    for workers in args.scaling:
+        summary = convert_corpus(args.source, args.output, workers, args.chunksize, args.regex_only,
+                                 args.cache, args.cache_size, args.snapshot, args.export,
+                                 args.shared_tables)
+        if base is None:
+            base = summary
+        # Throughput per worker relative to the first run's throughput per worker
+        efficiency = (summary["lines_per_second"] / workers) / (base["lines_per_second"] / base["workers"])
+        print(f"{workers:>7} {summary['seconds']:>9.2f} {summary['recipes_per_second']:>10.1f} "
+              f"{summary['lines_per_second']:>10.1f} {efficiency:>10.0%} "
+              f"{summary.get('worker_rss_mib', 0):>10.1f} {summary.get('worker_private_mib', 0):>8.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# fuzzy_index.py
+from array import array
+from bisect import bisect_left
+from collections import Counter
+import heapq
+from math import ceil
+
+from ingredient_matcher import normalize_name
+
+# Lowest score a fuzzy candidate needs to be accepted as an ingredient; low
+# enough for one dropped or swapped letter in a short word ("flor", "suger")
+MIN_SCORE = 0.4
+
+
+def trigrams(text):
+    """Return the set of character trigrams of text's words, each padded with spaces."""
+    grams = set()
+    for word in normalize_name(text).split():
+        padded = f" {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class FuzzyIndex:
+    """Approximate string lookup through an inverted index of character trigrams.
+
+    Each trigram maps to the sorted ids of the strings containing it, and a
+    candidate is scored by the Dice coefficient of the two trigram sets. Only
+    the posting lists of the query's rarest trigrams are scanned for
+    candidates: a string sharing none of them can't reach min_score, so a
+    lookup costs a few short lists rather than a pass over every string.
+    """
+
+    def __init__(self, strings):
+        self.strings = list(strings)
+        self._postings = {}
+        self._sizes = array("I")
+        for index, text in enumerate(self.strings):
+            grams = trigrams(text)
+            self._sizes.append(len(grams))
+            for gram in grams:
+                postings = self._postings.get(gram)
+                if postings is None:
+                    postings = self._postings[gram] = array("I")
+                postings.append(index)
+
+    def __len__(self):
+        return len(self.strings)
+
+    def score(self, query, index):
+        """Return the Dice score of query against string index, as top_k would."""
+        grams = trigrams(query)
+        shared = len(grams & trigrams(self.strings[index]))
+        return 2 * shared / (len(grams) + self._sizes[index]) if grams else 0.0
+
+    def top_k(self, query, k=5, min_score=0.0):
+        """Return up to k (index, score) pairs for the strings most like query, best first.
+
+        Scores run from 0 to 1 (identical trigram sets); ties go to the
+        string added first.
+        """
+        grams = trigrams(query)
+        if not grams or k <= 0:
+            return []
+        postings = self._postings
+        grams = sorted(grams, key=lambda gram: len(postings.get(gram, ())))
+        # A Dice score of s needs at least s * |q| / (2 - s) shared trigrams,
+        # so every match is in one of the first |q| - needed + 1 lists.
+        needed = max(1, ceil(min_score * len(grams) / (2 - min_score) - 1e-9))
+        split = len(grams) - needed + 1
+        shared = Counter()
+        for gram in grams[:split]:
+            shared.update(postings.get(gram, ()))
+        for gram in grams[split:]:
+            ids = postings.get(gram)
+            if not ids:
+                continue
+            for index in shared:
+                position = bisect_left(ids, index)
+                if position < len(ids) and ids[position] == index:
+                    shared[index] += 1
+
+        sizes = self._sizes
+        total = len(grams)
+        scored = []
+        for index, count in shared.items():
+            score = 2 * count / (total + sizes[index])
+            if score >= min_score:
+                scored.append((index, score))
+        return heapq.nsmallest(k, scored, key=lambda candidate: (-candidate[1], candidate[0]))
+
+
+class FuzzyMatcher:
+    """Resolve misspelled ingredient names ("flor", "choclate chips") to database entries.
+
+    Candidates come from two trigram indexes: one over whole names, and one
+    over the words they are made of. Each query word is corrected to its
+    closest known word and the corrected text goes through the exact
+    matcher, so "flor" resolves like "flour" would, to all-purpose flour
+    rather than whichever flour has the shortest name.
+    """
+
+    def __init__(self, ingredient_database, matcher):
+        self.matcher = matcher
+        names = [normalize_name(item["name"]) for item in ingredient_database]
+        self.names = FuzzyIndex(names)
+        self.vocabulary = sorted({word for name in names for word in name.split()})
+        self._known_words = set(self.vocabulary)
+        self.words = FuzzyIndex(self.vocabulary)
+
+    def correct(self, text, min_score=MIN_SCORE):
+        """Return (text with each word replaced by its closest known word, mean word score).
+
+        Words without a close enough match are dropped, and count as 0
+        towards the score.
+        """
+        words = normalize_name(text).split()
+        corrected = []
+        total = 0.0
+        for word in words:
+            if word in self._known_words:
+                corrected.append(word)
+                total += 1.0
+                continue
+            best = self.words.top_k(word, 1, min_score)
+            if best:
+                index, score = best[0]
+                corrected.append(self.vocabulary[index])
+                total += score
+        return " ".join(corrected), (total / len(words) if words else 0.0)
+
+    def top_k(self, text, k=5, min_score=MIN_SCORE):
+        """Return up to k (database index, score) pairs for an ingredient name, best first."""
+        candidates = dict(self.names.top_k(text, k, min_score))
+        corrected, score = self.correct(text, min_score)
+        if corrected and score >= min_score:
+            index = self.matcher.match_id(corrected)
+            if index is not None and score > candidates.get(index, 0.0):
+                candidates[index] = score
+        return heapq.nsmallest(k, candidates.items(), key=lambda candidate: (-candidate[1], candidate[0]))
+
+    def best_id(self, text, min_score=MIN_SCORE):
+        """Return the database index of the best candidate for text, or None."""
+        candidates = self.top_k(text, 1, min_score)
+        return candidates[0][0] if candidates else None
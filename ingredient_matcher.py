@@ -0,0 +1,153 @@
+# ingredient_matcher.py
+from collections import Counter, deque
+
+# Names whose word sets have a Jaccard similarity above this are the same
+# ingredient, e.g. "flour whole wheat sifted" and "whole wheat flour" (0.75).
+SIMILARITY_THRESHOLD = 0.7
+
+
+def normalize_name(text):
+    """Lowercase text and collapse runs of whitespace to single spaces."""
+    return " ".join(text.lower().split())
+
+
+class WordOverlapIndex:
+    """Database entries by word, for finding names that share most of their words with a query."""
+
+    def __init__(self, names):
+        self._entries = {}  # word -> indexes of the entries whose names contain it
+        self._sizes = []    # distinct words per entry
+        for index, name in enumerate(names):
+            words = set(normalize_name(name).split())
+            self._sizes.append(len(words))
+            for word in words:
+                self._entries.setdefault(word, []).append(index)
+
+    def similar_id(self, name, threshold=SIMILARITY_THRESHOLD):
+        """Return the first entry whose word set's Jaccard similarity with name's is above threshold, or None."""
+        words = set(normalize_name(name).split())
+        shared = Counter()
+        for word in words:
+            shared.update(self._entries.get(word, ()))
+        best = None
+        for index, count in shared.items():
+            if count / (len(words) + self._sizes[index] - count) > threshold and (best is None or index < best):
+                best = index
+        return best
+
+
+class IngredientMatcher:
+    """Find ingredient names in text without scanning the whole database.
+
+    The database names are compiled once into an Aho-Corasick automaton, so
+    finding the longest ingredient mentioned in a line is a single pass over
+    the line's characters no matter how many ingredients are loaded. A phrase
+    index covers the reverse case, where the text is only part of a database
+    name (e.g. "sugar" for "granulated sugar"), and a word index the case
+    where most but not all words are shared ("flour whole wheat sifted").
+    """
+
+    def __init__(self, ingredient_database):
+        self.ingredient_database = ingredient_database
+        # Automaton states: outgoing edges, failure link, and the longest
+        # database name ending at the state as (length, index) or None.
+        self._goto = [{}]
+        self._fail = [0]
+        self._output = [None]
+        # Word n-gram of any name -> index of the first entry containing it.
+        self._phrases = {}
+        # Sorted word set of a full name -> index, for reordered names.
+        self._word_sets = {}
+        # Built on first use by similar_id
+        self._overlap = None
+
+        for index, item in enumerate(ingredient_database):
+            name = normalize_name(item["name"])
+            self._add_name(name, index)
+            self._add_phrases(name, index)
+        self._build_failure_links()
+
+    def _add_name(self, name, index):
+        state = 0
+        for char in name:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(None)
+            state = next_state
+        if self._output[state] is None:
+            self._output[state] = (len(name), index)
+
+    def _add_phrases(self, name, index):
+        words = name.split()
+        for start in range(len(words)):
+            for end in range(start + 1, len(words) + 1):
+                self._phrases.setdefault(" ".join(words[start:end]), index)
+        self._word_sets.setdefault(" ".join(sorted(set(words))), index)
+
+    def _build_failure_links(self):
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                if self._output[next_state] is None:
+                    # Nothing ends exactly here; inherit the longest suffix match.
+                    self._output[next_state] = self._output[self._fail[next_state]]
+
+    def find_id(self, text):
+        """Return the index of the longest database name occurring in text, or None."""
+        goto = self._goto
+        fail = self._fail
+        output = self._output
+        best = None
+        state = 0
+        for char in normalize_name(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            found = output[state]
+            if found is not None and (best is None or found[0] > best[0]
+                                      or (found[0] == best[0] and found[1] < best[1])):
+                best = found
+        return best[1] if best is not None else None
+
+    def lookup_id(self, name):
+        """Return the index of the first entry whose name contains name as whole words, or None."""
+        name = normalize_name(name)
+        index = self._phrases.get(name)
+        if index is None:
+            index = self._word_sets.get(" ".join(sorted(set(name.split()))))
+        return index
+
+    def similar_id(self, name):
+        """Return the first entry sharing most of its words with name (Jaccard similarity), or None."""
+        if self._overlap is None:
+            self._overlap = WordOverlapIndex(item["name"] for item in self.ingredient_database)
+        return self._overlap.similar_id(name)
+
+    def match_id(self, name):
+        """Resolve an ingredient name to a database index, or None if unknown."""
+        index = self.find_id(name)
+        if index is None:
+            index = self.lookup_id(name)
+        if index is None:
+            index = self.similar_id(name)
+        return index
+
+    def find(self, text):
+        """Return the database entry of the longest name occurring in text, or None."""
+        index = self.find_id(text)
+        return self.ingredient_database[index] if index is not None else None
+
+    def match(self, name):
+        """Resolve an ingredient name to its database entry, or None if unknown."""
+        index = self.match_id(name)
+        return self.ingredient_database[index] if index is not None else None
@@ -0,0 +1,389 @@
+"""Compile an ingredient database into a binary snapshot that loads without parsing.
+
+    python ingredient_snapshot.py -o ingredients.snap
+    python ingredient_snapshot.py --json extended_database.json -o ingredients.snap
+
+The snapshot holds everything RecipeParser would otherwise build at startup:
+the numeric columns and type codes of an IngredientTable, a string table of
+names, hash indexes for exact names, name phrases and word sets, and the
+IngredientMatcher automaton as flat arrays. load_snapshot() memory-maps the
+file and wraps those sections in memoryviews, so loading costs the same for
+33 entries or 100k, and worker processes that map the same file share its
+pages through the OS page cache.
+
+Layout (little-endian): an 8-byte magic, a format version and a section
+count, then a directory of (name, offset, length) entries and the sections
+themselves, each aligned to 8 bytes. The "meta" section is JSON; the rest
+are packed arrays.
+"""
+import argparse
+from array import array
+from collections.abc import Sequence
+import json
+import mmap
+import struct
+import sys
+import zlib
+
+from ingredient_matcher import IngredientMatcher, WordOverlapIndex, normalize_name
+from ingredient_table import NUMERIC_FIELDS, IngredientTable, database_digest
+
+MAGIC = b"PBSNAP\x00\x00"
+FORMAT_VERSION = 1
+HEADER = struct.Struct("<8sII")
+SECTION = struct.Struct("<16sQQ")
+NO_MATCH = 0xFFFFFFFF
+
+
+def _hash(encoded):
+    return zlib.crc32(encoded)
+
+
+class _SnapshotBuilder:
+    """Collects interned strings and named sections, then packs them into bytes."""
+
+    def __init__(self):
+        self.strings = []
+        self.string_ids = {}
+        self.sections = {}
+
+    def add_string(self, text, intern=True):
+        if intern:
+            string_id = self.string_ids.get(text)
+            if string_id is not None:
+                return string_id
+        string_id = len(self.strings)
+        self.strings.append(text)
+        self.string_ids.setdefault(text, string_id)
+        return string_id
+
+    def add_index(self, prefix, mapping):
+        """Add an open-addressing hash index of string -> u32 value."""
+        keys = array("I")
+        values = array("I")
+        slots = array("I", [0]) * _table_size(len(mapping))
+        mask = len(slots) - 1
+        for key, value in mapping.items():
+            keys.append(self.add_string(key))
+            values.append(value)
+            slot = _hash(key.encode("utf-8")) & mask
+            while slots[slot]:
+                slot = (slot + 1) & mask
+            slots[slot] = len(keys)  # entry number + 1; 0 marks an empty slot
+        self.sections[prefix + "_slots"] = slots
+        self.sections[prefix + "_keys"] = keys
+        self.sections[prefix + "_values"] = values
+
+    def pack(self, meta):
+        encoded = [text.encode("utf-8") for text in self.strings]
+        offsets = array("I", [0])
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        meta = dict(meta, string_count=len(self.strings))
+        sections = {"meta": json.dumps(meta).encode("utf-8"), "string_offsets": offsets,
+                    "strings": b"".join(encoded)}
+        sections.update(self.sections)
+
+        blobs = [(name, data if isinstance(data, bytes) else data.tobytes())
+                 for name, data in sections.items()]
+        offset = _align(HEADER.size + SECTION.size * len(blobs))
+        directory = []
+        for name, data in blobs:
+            directory.append(SECTION.pack(name.encode("ascii"), offset, len(data)))
+            offset = _align(offset + len(data))
+
+        out = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(blobs)))
+        out += b"".join(directory)
+        for name, data in blobs:
+            out += b"\0" * (_align(len(out)) - len(out))
+            out += data
+        return bytes(out)
+
+
+def _align(offset):
+    return (offset + 7) & ~7
+
+
+def _table_size(count):
+    size = 8
+    while size < count * 2:
+        size *= 2
+    return size
+
+
+def build_snapshot(ingredient_database):
+    """Return the snapshot bytes for a list of ingredient dicts."""
+    if sys.byteorder != "little":
+        raise RuntimeError("ingredient snapshots are little-endian only")
+    builder = _SnapshotBuilder()
+    table = IngredientTable.from_database(ingredient_database)
+    matcher = IngredientMatcher(ingredient_database)
+
+    # Row i's name is string i
+    for name in table.names:
+        builder.add_string(name, intern=False)
+    columns = array("d")
+    for field in NUMERIC_FIELDS:
+        columns.extend(table.columns[field])
+    builder.sections["columns"] = columns
+    builder.sections["type_codes"] = table.type_codes
+
+    builder.add_index("name", table._ids_by_name)
+    builder.add_index("phrase", matcher._phrases)
+    builder.add_index("wordset", matcher._word_sets)
+
+    # The automaton in compressed sparse rows: state s's edges are positions
+    # edge_offsets[s]..edge_offsets[s + 1] of edge_chars and edge_targets.
+    edge_offsets = array("I", [0])
+    edge_chars = []
+    edge_targets = array("I")
+    for edges in matcher._goto:
+        for char in sorted(edges):
+            edge_chars.append(char)
+            edge_targets.append(edges[char])
+        edge_offsets.append(len(edge_targets))
+    out_length = array("I")
+    out_index = array("I")
+    for found in matcher._output:
+        out_length.append(found[0] if found is not None else 0)
+        out_index.append(found[1] if found is not None else NO_MATCH)
+    builder.sections.update({
+        "edge_offsets": edge_offsets,
+        "edge_chars": "".join(edge_chars).encode("utf-32-le"),
+        "edge_targets": edge_targets,
+        "fail": array("I", matcher._fail),
+        "out_length": out_length,
+        "out_index": out_index,
+    })
+
+    return builder.pack({
+        "rows": len(table),
+        "fields": list(NUMERIC_FIELDS),
+        "types": table.types,
+        "content_hash": database_digest(ingredient_database),
+    })
+
+
+def write_snapshot(path, ingredient_database):
+    """Compile ingredient_database into a snapshot file at path."""
+    data = build_snapshot(ingredient_database)
+    with open(path, "wb") as file:
+        file.write(data)
+    return len(data)
+
+
+def load_snapshot(path):
+    """Memory-map a snapshot file and return it as a SnapshotTable."""
+    with open(path, "rb") as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return SnapshotTable(mapped)
+
+
+class _StringTable(Sequence):
+    """Strings decoded on access from the snapshot's string section."""
+
+    def __init__(self, offsets, data, count):
+        self._offsets = offsets
+        self._data = data
+        self._count = count
+
+    def raw(self, index):
+        return self._data[self._offsets[index]:self._offsets[index + 1]]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("string index out of range")
+        return str(self.raw(index), "utf-8")
+
+
+class _HashIndex:
+    """Read-only view of a hash index written by _SnapshotBuilder.add_index."""
+
+    def __init__(self, strings, slots, keys, values):
+        self._strings = strings
+        self._slots = slots
+        self._keys = keys
+        self._values = values
+        self._mask = len(slots) - 1
+
+    def get(self, key):
+        encoded = key.encode("utf-8")
+        slots = self._slots
+        slot = _hash(encoded) & self._mask
+        while True:
+            entry = slots[slot]
+            if not entry:
+                return None
+            if self._strings.raw(self._keys[entry - 1]) == encoded:
+                return self._values[entry - 1]
+            slot = (slot + 1) & self._mask
+
+
+class SnapshotTable(IngredientTable):
+    """An IngredientTable backed by a snapshot buffer instead of Python objects.
+
+    buffer is anything supporting the buffer protocol: a memory-mapped file
+    (see load_snapshot), a bytes object or a shared memory block. Rows are
+    read-only. The matcher() method returns a SnapshotMatcher over the
+    prebuilt automaton, which RecipeParser uses instead of compiling an
+    IngredientMatcher.
+    """
+
+    def __init__(self, buffer):
+        self._buffer = buffer
+        view = memoryview(buffer)
+        magic, version, section_count = HEADER.unpack_from(view, 0)
+        if magic != MAGIC:
+            raise ValueError("not an ingredient snapshot")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"unsupported snapshot format {version} (expected {FORMAT_VERSION})")
+        sections = {}
+        for number in range(section_count):
+            name, offset, length = SECTION.unpack_from(view, HEADER.size + number * SECTION.size)
+            sections[name.rstrip(b"\0").decode("ascii")] = view[offset:offset + length]
+        self.sections = sections
+
+        meta = json.loads(bytes(sections["meta"]))
+        rows = meta["rows"]
+        self.content_hash = meta["content_hash"]
+        self.strings = _StringTable(sections["string_offsets"].cast("I"), sections["strings"],
+                                    meta["string_count"])
+        self.names = _StringTable(sections["string_offsets"].cast("I"), sections["strings"], rows)
+        self.types = meta["types"]
+        self.type_codes = sections["type_codes"].cast("B")
+        columns = sections["columns"].cast("d")
+        self.columns = {field: columns[number * rows:(number + 1) * rows]
+                        for number, field in enumerate(meta["fields"])}
+        self._type_codes_by_name = {name: code for code, name in enumerate(self.types)}
+        self._name_index = self._index("name")
+        self._matcher = None
+
+    def _index(self, prefix):
+        sections = self.sections
+        return _HashIndex(self.strings, sections[prefix + "_slots"].cast("I"),
+                          sections[prefix + "_keys"].cast("I"), sections[prefix + "_values"].cast("I"))
+
+    def append(self, item):
+        raise TypeError("snapshot tables are read-only; rebuild the snapshot to add ingredients")
+
+    def id_for(self, name):
+        """Return the id of the ingredient with this exact (normalized) name, or None."""
+        return self._name_index.get(normalize_name(name))
+
+    def matcher(self):
+        """Return the SnapshotMatcher for this table, built on first use."""
+        if self._matcher is None:
+            self._matcher = SnapshotMatcher(self)
+        return self._matcher
+
+
+class SnapshotMatcher:
+    """IngredientMatcher over a snapshot's prebuilt automaton and phrase indexes.
+
+    Gives the same answers as IngredientMatcher(table) without building
+    anything: state transitions are looked up in the snapshot's edge arrays.
+    """
+
+    def __init__(self, table):
+        sections = table.sections
+        self.ingredient_database = table
+        self._edge_offsets = sections["edge_offsets"].cast("I")
+        # Decoded once so each state's edges can be searched with str.find
+        self._edge_chars = bytes(sections["edge_chars"]).decode("utf-32-le")
+        self._edge_targets = sections["edge_targets"].cast("I")
+        self._fail = sections["fail"].cast("I")
+        self._out_length = sections["out_length"].cast("I")
+        self._out_index = sections["out_index"].cast("I")
+        self._phrases = table._index("phrase")
+        self._word_sets = table._index("wordset")
+        self._names = table.names
+        self._overlap = None
+
+    def find_id(self, text):
+        """Return the index of the longest database name occurring in text, or None."""
+        offsets = self._edge_offsets
+        chars = self._edge_chars
+        targets = self._edge_targets
+        fail = self._fail
+        out_length = self._out_length
+        out_index = self._out_index
+        best_length = 0
+        best_index = None
+        state = 0
+        for char in normalize_name(text):
+            while True:
+                position = chars.find(char, offsets[state], offsets[state + 1])
+                if position >= 0:
+                    state = targets[position]
+                    break
+                if not state:
+                    break
+                state = fail[state]
+            length = out_length[state]
+            if length and (length > best_length
+                           or (length == best_length and out_index[state] < best_index)):
+                best_length = length
+                best_index = out_index[state]
+        return best_index
+
+    def lookup_id(self, name):
+        """Return the index of the first entry whose name contains name as whole words, or None."""
+        name = normalize_name(name)
+        index = self._phrases.get(name)
+        if index is None:
+            index = self._word_sets.get(" ".join(sorted(set(name.split()))))
+        return index
+
+    def similar_id(self, name):
+        """Return the first entry sharing most of its words with name (Jaccard similarity), or None."""
+        if self._overlap is None:
+            # Not in the snapshot; built from the names the first time it's needed
+            self._overlap = WordOverlapIndex(self._names)
+        return self._overlap.similar_id(name)
+
+    def match_id(self, name):
+        """Resolve an ingredient name to a database index, or None if unknown."""
+        index = self.find_id(name)
+        if index is None:
+            index = self.lookup_id(name)
+        if index is None:
+            index = self.similar_id(name)
+        return index
+
+    def find(self, text):
+        """Return the database entry of the longest name occurring in text, or None."""
+        index = self.find_id(text)
+        return self.ingredient_database[index] if index is not None else None
+
+    def match(self, name):
+        """Resolve an ingredient name to its database entry, or None if unknown."""
+        index = self.match_id(name)
+        return self.ingredient_database[index] if index is not None else None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("-o", "--output", required=True, help="snapshot file to write")
+    parser.add_argument("--json", help="JSON list of ingredient dicts (default: INGREDIENT_DATABASE)")
+    args = parser.parse_args(argv)
+
+    if args.json:
+        with open(args.json, encoding="utf-8") as file:
+            database = json.load(file)
+    else:
+        from ingredient_database import INGREDIENT_DATABASE
+        database = INGREDIENT_DATABASE
+    size = write_snapshot(args.output, database)
+    print(f"Wrote {len(database)} ingredients to {args.output} ({size / 1024:.1f} KiB)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+# ingredient_table.py
+from array import array
+from collections.abc import Mapping, Sequence
+import hashlib
+import json
+import math
+
+from ingredient_matcher import normalize_name
+
+# Ingredient types are interned: each row stores a small index into this
+# tuple instead of its own string. Unseen types are appended per table.
+INGREDIENT_TYPES = ("dry", "liquid", "solid", "semi-solid", "whole")
+
+# Numeric columns, stored as doubles; NaN marks a field the entry lacks.
+NUMERIC_FIELDS = ("density", "gram_per_cup", "gram_per_tablespoon", "gram_per_teaspoon", "gram_per_unit")
+
+
+def database_digest(ingredient_database):
+    """Return a hex digest of a database's contents, e.g. to tell when cached results are stale.
+
+    Tables loaded from a snapshot carry the digest of the database they were
+    built from as content_hash, so it is not recomputed.
+    """
+    content_hash = getattr(ingredient_database, "content_hash", None)
+    if content_hash is not None:
+        return content_hash
+    data = json.dumps([dict(item) for item in ingredient_database], sort_keys=True, default=str)
+    return hashlib.blake2b(data.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class IngredientRecord(Mapping):
+    """Read-only view of one IngredientTable row.
+
+    Behaves like the dicts in INGREDIENT_DATABASE: record["name"],
+    record.get("gram_per_unit") and iteration over keys all work, and keys
+    for missing numeric fields are simply absent.
+    """
+
+    __slots__ = ("_table", "_index")
+
+    def __init__(self, table, index):
+        self._table = table
+        self._index = index
+
+    @property
+    def index(self):
+        """The row's id in its table."""
+        return self._index
+
+    def __getitem__(self, key):
+        table = self._table
+        if key == "name":
+            return table.names[self._index]
+        if key == "type":
+            return table.types[table.type_codes[self._index]]
+        column = table.columns.get(key)
+        if column is None:
+            raise KeyError(key)
+        value = column[self._index]
+        if math.isnan(value):
+            raise KeyError(key)
+        return value
+
+    def __iter__(self):
+        yield "name"
+        yield "type"
+        for field, column in self._table.columns.items():
+            if not math.isnan(column[self._index]):
+                yield field
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return f"IngredientRecord({dict(self)!r})"
+
+
+class IngredientTable(Sequence):
+    """Column-oriented ingredient database with O(1) lookup by id and by name.
+
+    Each numeric field is a packed array of doubles, types are interned to
+    one byte per row, and normalized names map straight to row ids. Indexing
+    the table returns IngredientRecord views, so a table can be passed
+    anywhere a list of ingredient dicts is expected, e.g.
+    RecipeParser(ingredient_database=table).
+    """
+
+    def __init__(self):
+        self.names = []
+        self.types = list(INGREDIENT_TYPES)
+        self.type_codes = array("B")
+        self.columns = {field: array("d") for field in NUMERIC_FIELDS}
+        self._type_codes_by_name = {name: code for code, name in enumerate(self.types)}
+        self._ids_by_name = {}
+
+    @classmethod
+    def from_database(cls, ingredient_database):
+        """Build a table from a list of ingredient dicts."""
+        table = cls()
+        for item in ingredient_database:
+            table.append(item)
+        return table
+
+    def append(self, item):
+        """Add an ingredient dict as a new row and return its id."""
+        index = len(self.names)
+        name = item["name"]
+        self.names.append(name)
+
+        ingredient_type = item["type"]
+        code = self._type_codes_by_name.get(ingredient_type)
+        if code is None:
+            code = len(self.types)
+            self.types.append(ingredient_type)
+            self._type_codes_by_name[ingredient_type] = code
+        self.type_codes.append(code)
+
+        for field, column in self.columns.items():
+            value = item.get(field)
+            column.append(math.nan if value is None else value)
+
+        key = normalize_name(name)
+        if key == name:
+            key = name  # share the string instead of keeping an equal copy
+        self._ids_by_name.setdefault(key, index)
+        return index
+
+    def __len__(self):
+        return len(self.names)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [IngredientRecord(self, i) for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ingredient id out of range")
+        return IngredientRecord(self, index)
+
+    def id_for(self, name):
+        """Return the id of the ingredient with this exact (normalized) name, or None."""
+        return self._ids_by_name.get(normalize_name(name))
+
+    def lookup(self, name):
+        """Return the record for an exact (normalized) name, or None."""
+        index = self.id_for(name)
+        return IngredientRecord(self, index) if index is not None else None
+
+    def column(self, field):
+        """Return the packed array of values for a numeric field."""
+        return self.columns[field]
@@ -0,0 +1,299 @@
+"""Token-classification tagger for ingredient lines (QTY / UNIT / NAME spans).
+
+A small transformer checkpoint, fine-tuned to label each word of a line, run
+on CPU with int8 dynamic quantization. Lines from every caller go through
+one queue and are tagged in batches, so concurrent parsers share forward
+passes. Checkpoints are only ever read from a local directory:
+
+    python ingredient_tagger.py --base models/distilbert-base-uncased -o models/ingredient-tagger
+    PRECISION_BAKING_TAGGER=models/ingredient-tagger python recipe_parser.py
+
+Training data is the labeled synthetic corpus from benchmarks/corpus.py.
+Requires torch and transformers.
+"""
+import argparse
+from concurrent.futures import Future
+import os
+import queue
+import random
+import re
+import sys
+import threading
+import time
+
+from line_grammar import VULGAR_FRACTIONS, parse_quantity
+
+# Directory of a fine-tuned checkpoint (as written by train_tagger); when it
+# is unset the parser has no tagger tier.
+TAGGER_ENV = "PRECISION_BAKING_TAGGER"
+
+LABELS = ("O", "B-QTY", "I-QTY", "B-UNIT", "I-UNIT", "B-NAME", "I-NAME")
+LABEL_IDS = {label: index for index, label in enumerate(LABELS)}
+
+# Subword tokens per line; ingredient lines are far shorter
+MAX_LENGTH = 64
+
+# Numbers (with their decimal point or fraction bar), words (with inner
+# hyphens or apostrophes, as in "all-purpose") and single other characters
+WORD = re.compile(r"\d+(?:[./]\d+)?|[^\W\d_]+(?:['-][^\W\d_]+)*|\S")
+
+
+def tagger_path():
+    """Return the checkpoint directory from PRECISION_BAKING_TAGGER, or None."""
+    return os.environ.get(TAGGER_ENV) or None
+
+
+def split_words(line):
+    """Split a line into the words the tagger labels."""
+    return WORD.findall(line)
+
+
+def label_words(words, truth):
+    """Return BIO labels for words from a line's known quantity, unit and name (for training)."""
+    labels = ["O"] * len(words)
+    if truth.get("quantity") is None:
+        return labels  # headers have nothing to tag
+    lowered = [word.lower() for word in words]
+
+    for index, word in enumerate(words):
+        if parse_quantity(word) is not None:
+            labels[index] = "B-QTY"
+            following = words[index + 1] if index + 1 < len(words) else ""
+            if ("/" in following or following in VULGAR_FRACTIONS) and parse_quantity(following) is not None:
+                labels[index + 1] = "I-QTY"
+            break
+
+    for kind, text in (("UNIT", truth.get("unit")), ("NAME", truth.get("name"))):
+        if not text:
+            continue
+        target = [word.lower() for word in split_words(text)]
+        for start in range(len(words) - len(target) + 1):
+            if lowered[start:start + len(target)] == target \
+                    and all(label == "O" for label in labels[start:start + len(target)]):
+                labels[start] = f"B-{kind}"
+                for index in range(start + 1, start + len(target)):
+                    labels[index] = f"I-{kind}"
+                break
+    return labels
+
+
+def words_to_record(line, words, labels):
+    """Build a parser record from labeled words: the first QTY and UNIT spans and every NAME word."""
+    spans = []  # [kind, words] in line order
+    previous = "O"
+    for word, label in zip(words, labels):
+        if label != "O":
+            kind = label[2:]
+            if label.startswith("B-") or previous == "O" or previous[2:] != kind:
+                spans.append([kind, [word]])
+            else:
+                spans[-1][1].append(word)
+        previous = label
+
+    quantity_words = next((span for kind, span in spans if kind == "QTY"), None)
+    unit_words = next((span for kind, span in spans if kind == "UNIT"), None)
+    name_words = [word for kind, span in spans if kind == "NAME" for word in span]
+    if quantity_words is None and unit_words is None:
+        return {"original": line, "quantity": None, "unit": None, "name": line, "notes": None,
+                "is_header": True}
+    return {
+        "original": line,
+        "quantity": parse_quantity(" ".join(quantity_words)) if quantity_words else None,
+        "unit": " ".join(unit_words).lower() if unit_words else None,
+        "name": " ".join(name_words),
+        "notes": None,
+        "is_header": False
+    }
+
+
+class IngredientTagger:
+    """Tag ingredient lines with a token-classification model, batching queued lines.
+
+    tag() and submit() put lines on one queue. A worker thread takes the
+    first waiting line, gathers whatever else arrives within max_wait (up
+    to max_batch_size lines) and runs them through the model together.
+    Each result is (record, certainty), where certainty is the mean
+    probability of the predicted label over the line's words.
+    """
+
+    def __init__(self, tokenizer, model, max_batch_size=32, max_wait=0.002, max_length=MAX_LENGTH):
+        self.tokenizer = tokenizer
+        self.model = model
+        self.id2label = {int(index): label for index, label in model.config.id2label.items()}
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_length = max_length
+        self.batches = 0
+        self.lines = 0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def tag(self, lines):
+        """Return (record, certainty) for each line, waiting for the queued batches."""
+        futures = [self.submit(line) for line in lines]
+        return [future.result() for future in futures]
+
+    def submit(self, line):
+        """Queue one line and return a Future of its (record, certainty)."""
+        if self._worker is None:
+            with self._worker_lock:
+                if self._worker is None:
+                    self._worker = threading.Thread(target=self._run, name="ingredient-tagger", daemon=True)
+                    self._worker.start()
+        future = Future()
+        self._queue.put((line, future))
+        return future
+
+    def _run(self):
+        """Worker thread: tag queued lines in batches until close()."""
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            if item is None:
+                return
+            batch = [item]
+            deadline = time.monotonic() + self.max_wait
+            while len(batch) < self.max_batch_size:
+                try:
+                    # Lines already waiting are taken without a timeout
+                    item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    closing = True
+                    break
+                batch.append(item)
+
+            try:
+                results = self.tag_batch([line for line, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+            for (_, future), result in zip(batch, results):
+                future.set_result(result)
+
+    def tag_batch(self, lines):
+        """Run one forward pass over lines and return (record, certainty) for each."""
+        import torch
+        words = [split_words(line) for line in lines]
+        encoding = self.tokenizer(words, is_split_into_words=True, truncation=True,
+                                  max_length=self.max_length, padding=True, return_tensors="pt")
+        with torch.inference_mode():
+            logits = self.model(**encoding).logits
+        certainty, predicted = logits.softmax(-1).max(-1)
+        self.batches += 1
+        self.lines += len(lines)
+
+        results = []
+        for row, (line, line_words) in enumerate(zip(lines, words)):
+            labels = ["O"] * len(line_words)
+            scores = []
+            previous = None
+            for position, word_index in enumerate(encoding.word_ids(row)):
+                # Each word is labeled by its first subword token
+                if word_index is not None and word_index != previous:
+                    labels[word_index] = self.id2label[int(predicted[row, position])]
+                    scores.append(float(certainty[row, position]))
+                previous = word_index
+            results.append((words_to_record(line, line_words, labels),
+                            sum(scores) / len(scores) if scores else 0.0))
+        return results
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "lines": self.lines,
+            "mean_batch_lines": round(self.lines / self.batches, 2) if self.batches else 0,
+            "queued": self._queue.qsize(),
+        }
+
+    def close(self):
+        """Stop the worker thread once the lines already queued are tagged."""
+        if self._worker is not None:
+            self._queue.put(None)
+            self._worker.join()
+            self._worker = None
+
+
+def load_tagger(path, quantize=True, num_threads=None, **options):
+    """Load an IngredientTagger from a local checkpoint directory, without network access.
+
+    With quantize, every Linear layer gets int8 weights and dynamically
+    quantized activations (torch.quantization.quantize_dynamic), which
+    shrinks the model about 4x and speeds up CPU inference.
+    """
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+    if num_threads:
+        torch.set_num_threads(num_threads)
+    tokenizer = AutoTokenizer.from_pretrained(path, local_files_only=True)
+    model = AutoModelForTokenClassification.from_pretrained(path, local_files_only=True)
+    model.eval()
+    if quantize:
+        model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return IngredientTagger(tokenizer, model, **options)
+
+
+def train_tagger(base, output, examples, epochs=2, batch_size=32, learning_rate=5e-5, seed=0):
+    """Fine-tune the local checkpoint base on (line, truth) examples and save the tagger to output."""
+    import torch
+    from transformers import AutoModelForTokenClassification, AutoTokenizer
+    torch.manual_seed(seed)
+    tokenizer = AutoTokenizer.from_pretrained(base, local_files_only=True)
+    model = AutoModelForTokenClassification.from_pretrained(
+        base, local_files_only=True, num_labels=len(LABELS),
+        id2label=dict(enumerate(LABELS)), label2id=LABEL_IDS)
+    data = []
+    for line, truth in examples:
+        words = split_words(line)
+        data.append((words, [LABEL_IDS[label] for label in label_words(words, truth)]))
+
+    optimizer = torch.optim.AdamW(model.parameters(), lr=learning_rate)
+    model.train()
+    rng = random.Random(seed)
+    for epoch in range(epochs):
+        rng.shuffle(data)
+        total = 0.0
+        for start in range(0, len(data), batch_size):
+            batch = data[start:start + batch_size]
+            encoding = tokenizer([words for words, _ in batch], is_split_into_words=True, truncation=True,
+                                 max_length=MAX_LENGTH, padding=True, return_tensors="pt")
+            # Only each word's first subword token is scored (-100 is ignored)
+            labels = torch.full(encoding["input_ids"].shape, -100, dtype=torch.long)
+            for row, (_, word_labels) in enumerate(batch):
+                previous = None
+                for position, word_index in enumerate(encoding.word_ids(row)):
+                    if word_index is not None and word_index != previous:
+                        labels[row, position] = word_labels[word_index]
+                    previous = word_index
+            loss = model(**encoding, labels=labels).loss
+            loss.backward()
+            optimizer.step()
+            optimizer.zero_grad()
+            total += loss.item() * len(batch)
+        print(f"epoch {epoch + 1}: loss {total / len(data):.4f}")
+
+    model.save_pretrained(output)
+    tokenizer.save_pretrained(output)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--base", required=True, help="local checkpoint to fine-tune, e.g. distilbert-base-uncased")
+    parser.add_argument("-o", "--output", required=True, help="directory for the tagger checkpoint")
+    parser.add_argument("--lines", type=int, default=20000, help="synthetic training lines")
+    parser.add_argument("--epochs", type=int, default=2)
+    parser.add_argument("--batch-size", type=int, default=32)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    from benchmarks.corpus import iter_labeled_lines
+    examples = [(line, truth) for _, line, truth in iter_labeled_lines(args.lines, args.seed)]
+    train_tagger(args.base, args.output, examples, args.epochs, args.batch_size, seed=args.seed)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
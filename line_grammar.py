@@ -0,0 +1,134 @@
+# line_grammar.py
+import re
+
+from units import UNIT_ALIASES
+
+VULGAR_FRACTIONS = {"½": 1 / 2, "¼": 1 / 4, "¾": 3 / 4, "⅓": 1 / 3, "⅔": 2 / 3, "⅛": 1 / 8}
+_VULGAR = "".join(VULGAR_FRACTIONS)
+
+# Known units from the unit registry, longest first so "tablespoons" wins
+# over "tablespoon". Multi-word units such as "fl oz" may be separated by any
+# whitespace. The pattern ignores case, so only lower-case spellings are needed.
+_UNIT_ALTERNATIVES = "|".join(
+    re.escape(unit).replace(r"\ ", r"\s+")
+    for unit in sorted({alias.lower() for alias in UNIT_ALIASES}, key=len, reverse=True))
+
+# 2 | 1.5 | 1/2 | 1 1/2 | ½ | 1½
+_QUANTITY = rf"\d+\s+\d+/\d+|\d+/\d+|(?:\d+(?:\.\d+)?|\.\d+)(?:\s*[{_VULGAR}])?|[{_VULGAR}]"
+
+# One anchored pass over an ingredient line:
+#
+#   quantity   2 | 1.5 | 1/2 | 1 1/2 | ½ | 1½
+#   unit       an optional known unit, with an optional trailing "."
+#   of         an optional "of"
+#   rest       the ingredient name, parenthetical notes and ", notes"
+#
+# No two adjacent parts can both match the same text except optional
+# whitespace, and the rest group matches anything, so once a quantity is
+# found the match cannot fail and nothing is retried. Matching is linear in
+# the line length; benchmarks/grammar_adversarial.py checks this.
+LINE_PATTERN = re.compile(
+    rf"(?P<quantity>{_QUANTITY})"
+    rf"\s*(?:(?P<unit>{_UNIT_ALTERNATIVES})\.?(?!\w)\s*)?"
+    r"(?:of\s+)?"
+    r"(?P<rest>.*)",
+    re.IGNORECASE | re.DOTALL)
+
+# The first quantity anywhere in a line, and the unit right after it if any,
+# as in "Butter: 1/2 cup, softened". A match can't start inside a number, so
+# each run of digits is tried once and the search stays linear.
+QUANTITY_SEARCH = re.compile(
+    rf"(?<![\w./])(?P<quantity>{_QUANTITY})\s*(?:(?P<unit>{_UNIT_ALTERNATIVES})\.?(?!\w))?",
+    re.IGNORECASE)
+
+# "a pinch", "an ounce": one of a unit, written without digits
+ARTICLE_QUANTITY = re.compile(
+    rf"(?<!\w)(?:a|an|one)\s+(?P<unit>{_UNIT_ALTERNATIVES})\.?(?!\w)",
+    re.IGNORECASE)
+
+# Innermost parentheses only, so nested or unbalanced ones cannot backtrack
+PARENTHETICAL = re.compile(r"\(([^()]*)\)")
+_DIGIT = re.compile(r"\d")
+
+
+def _parse_number(part):
+    if part[-1] in VULGAR_FRACTIONS:
+        return float(part[:-1] or 0) + VULGAR_FRACTIONS[part[-1]]
+    if "/" in part:
+        numerator, denominator = part.split("/")
+        return int(numerator) / int(denominator)
+    return float(part)
+
+
+def parse_quantity(text):
+    """Convert a quantity such as "2", "1.5", "1/2", "1 1/2" or "1½" to a float, or None."""
+    parts = text.split()
+    if not parts or len(parts) > 2:
+        return None
+    if len(parts) == 2 and "/" not in parts[1] and parts[1][-1] not in VULGAR_FRACTIONS:
+        return None  # only a whole number followed by a fraction adds up
+    try:
+        return sum(_parse_number(part) for part in parts)
+    except (ValueError, ZeroDivisionError):
+        return None
+
+
+def find_quantity(line):
+    """Return (quantity, unit) for the first quantity anywhere in line, or (None, None).
+
+    The unit is lower case with single spaces, or None if none follows. A
+    line without a number may still give one of a unit ("a pinch of salt").
+    """
+    match = QUANTITY_SEARCH.search(line)
+    if not match:
+        match = ARTICLE_QUANTITY.search(line)
+        if not match:
+            return None, None
+        return 1.0, " ".join(match.group("unit").lower().split())
+    unit = match.group("unit")
+    return parse_quantity(match.group("quantity")), " ".join(unit.lower().split()) if unit else None
+
+
+def parse_line(line):
+    """Parse a stripped ingredient line into the parser's record format.
+
+    Returns quantity, unit (as written, lower case), name, notes (text from
+    parentheses and after the first comma, or None) and is_header. Lines that
+    don't start with a quantity get quantity None and the whole line as name.
+    """
+    match = LINE_PATTERN.match(line)
+    if match:
+        quantity = parse_quantity(match.group("quantity"))
+        unit = match.group("unit")
+        rest = match.group("rest")
+        notes = []
+        if "(" in rest:
+            notes.extend(note.strip() for note in PARENTHETICAL.findall(rest))
+            rest = PARENTHETICAL.sub(" ", rest)
+        name, comma, note = rest.partition(",")
+        if comma:
+            notes.append(note.strip())
+        name = " ".join(name.split())
+        lowered = name.lower()
+        # For eggs the unit is the egg itself, whatever size is given
+        if unit is None and "egg" in lowered and "white" not in lowered and "yolk" not in lowered:
+            name = "eggs"
+        if quantity is not None and name:
+            return {
+                "original": line,
+                "quantity": quantity,
+                "unit": " ".join(unit.lower().split()) if unit else None,
+                "name": name,
+                "notes": "; ".join(note for note in notes if note) or None,
+                "is_header": False
+            }
+
+    # If nothing matches, it might be a header or unstructured text
+    return {
+        "original": line,
+        "quantity": None,
+        "unit": None,
+        "name": line,
+        "notes": None,
+        "is_header": not _DIGIT.search(line)  # Assume lines without numbers are headers
+    }
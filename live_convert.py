@@ -0,0 +1,73 @@
+# live_convert.py
+
+
+class LiveConverter:
+    """Keep converted results in step with recipe text that is being edited.
+
+    Results are kept per input line (None for blank lines). diff() finds the
+    lines between the unchanged start and end of the text, only those are
+    converted again, and apply() splices them in, so unchanged lines keep
+    their earlier results and the cost of an edit follows the number of
+    edited lines. (Finding the edit is a prefix/suffix comparison of line
+    strings, which is cheap next to parsing.)
+
+    convert_lines takes a list of stripped, non-empty lines and returns one
+    converted ingredient dict per line, in order.
+    """
+
+    def __init__(self, convert_lines):
+        self.convert_lines = convert_lines
+        self.lines = []
+        self.items = []
+
+    def reset(self):
+        """Forget all lines, so the next update converts everything."""
+        self.lines = []
+        self.items = []
+
+    def diff(self, lines):
+        """Return (start, old_end, new_end) of the edited region, or None if nothing changed.
+
+        Previous lines start..old_end became lines[start:new_end].
+        """
+        old = self.lines
+        shortest = min(len(old), len(lines))
+        start = 0
+        while start < shortest and old[start] == lines[start]:
+            start += 1
+        same_tail = 0
+        while same_tail < shortest - start and old[-1 - same_tail] == lines[-1 - same_tail]:
+            same_tail += 1
+
+        old_end = len(old) - same_tail
+        new_end = len(lines) - same_tail
+        if start == old_end == new_end:
+            return None
+        return start, old_end, new_end
+
+    def convert(self, lines):
+        """Convert lines, returning one item per line and None for blank ones."""
+        stripped = [line.strip() for line in lines]
+        non_blank = [line for line in stripped if line]
+        converted = iter(self.convert_lines(non_blank) if non_blank else ())
+        return [next(converted) if line else None for line in stripped]
+
+    def apply(self, start, old_end, lines, items):
+        """Record that previous lines start..old_end are now lines, converted to items."""
+        self.lines[start:old_end] = lines
+        self.items[start:old_end] = items
+
+    def update(self, lines):
+        """Bring the results up to date with lines in one step.
+
+        Returns (start, old_end, new_items): rows start..old_end of the previous
+        results are replaced by new_items. Returns None if nothing changed.
+        """
+        change = self.diff(lines)
+        if change is None:
+            return None
+        start, old_end, new_end = change
+        changed = lines[start:new_end]
+        new_items = self.convert(changed)
+        self.apply(start, old_end, changed, new_items)
+        return start, old_end, new_items
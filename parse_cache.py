@@ -0,0 +1,77 @@
+# parse_cache.py
+from collections import OrderedDict
+import hashlib
+
+_MISSING = object()
+
+
+class LRUCache:
+    """Bounded least-recently-used cache with hit, miss and eviction counters.
+
+    A maxsize of 0 disables the cache: every lookup is a miss and nothing is
+    stored.
+    """
+
+    def __init__(self, maxsize):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key, default=None):
+        value = self._data.get(key, _MISSING)
+        if value is _MISSING:
+            self.misses += 1
+            return default
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        self._data[key] = value
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def clear(self):
+        self._data.clear()
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __len__(self):
+        return len(self._data)
+
+    def stats(self):
+        """Return the cache counters as a dict."""
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def normalize_line(line):
+    """Return the cache key for a recipe line: stripped, with whitespace collapsed."""
+    return " ".join(line.split())
+
+
+def recipe_key(text):
+    """Return the cache key for a whole recipe text."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def freeze_record(record):
+    """Return an immutable snapshot of a parsed-ingredient dict."""
+    return tuple(record.items())
+
+
+def thaw_record(frozen):
+    """Return a fresh, mutable dict from a frozen record."""
+    return dict(frozen)
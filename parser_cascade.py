@@ -0,0 +1,313 @@
+# parser_cascade.py
+import hashlib
+from time import perf_counter
+
+from line_grammar import ARTICLE_QUANTITY, VULGAR_FRACTIONS, find_quantity, parse_quantity
+from units import UNIT_ALIASES, is_unit
+
+# A tier's result is accepted once its confidence reaches this; lines no
+# tier is sure about get the most confident result any tier gave.
+DEFAULT_THRESHOLD = 0.8
+
+# Counter name for lines no tier reached the threshold on
+BEST_EFFORT = "best_effort"
+
+_QUANTITY_CHARS = frozenset("0123456789./") | frozenset(VULGAR_FRACTIONS)
+_DIGITS = frozenset("0123456789") | frozenset(VULGAR_FRACTIONS)
+
+
+def has_digit(line):
+    return not _DIGITS.isdisjoint(line)
+
+
+def known_ingredient(parser, name):
+    """Return a database index for name, or None; whole-name phrases are a dict lookup, the rest a scan."""
+    index = parser.matcher.lookup_id(name)
+    return index if index is not None else parser.matcher.find_id(name)
+
+
+def header_confidence(line):
+    """Score a line without digits as a section header.
+
+    "Frosting:" is certain. A line with "a <unit>" or a unit word ("a pinch
+    of salt", "pinch of nutmeg") may be an ingredient written without a
+    number, so it scores below the default threshold and later tiers get to
+    try it. Other lines, including titles naming an ingredient ("Cream
+    Cheese Frosting"), stay headers. Single-letter units (c, g, l) are too
+    often just letters to count.
+    """
+    if line.endswith(":"):
+        return 1.0
+    if ARTICLE_QUANTITY.search(line) or any(len(word) > 1 and is_unit(word)
+                                            for word in line.replace(",", " ").split()):
+        return 0.5
+    return 0.8
+
+
+def record_confidence(record, parser):
+    """Score a parsed record from 0 to 1 by how much of it the database and unit registry confirm.
+
+    A quantity, a known unit and a database ingredient score 1.0; an item
+    counted without a unit ("2 eggs") scores 0.9 when the ingredient has a
+    weight per item; a quantity and unit with an unknown name score 0.8.
+    Lines with digits but no quantity score lowest; headers are scored by
+    header_confidence.
+    """
+    if record.get("is_header", False):
+        return header_confidence(record["original"])
+    if record.get("quantity") is None:
+        return 0.2
+    index = known_ingredient(parser, record["name"]) if record.get("name") else None
+    if record.get("unit") is not None:
+        return 1.0 if index is not None else 0.8
+    if index is None:
+        return 0.4
+    return 0.9 if parser.ingredient_database[index].get("gram_per_unit") else 0.5
+
+
+class ParserTier:
+    """One way of parsing a line in a ParserCascade.
+
+    parse() returns (record, confidence) or None when the tier doesn't apply
+    to the line. Tiers that work better on many lines at once (spaCy's
+    nlp.pipe) override parse_batch() instead. Slow tiers run (and may load)
+    a model; ParserCascade.parse(quick=True) stops before the first one.
+    """
+
+    name = None
+    slow = False
+
+    def parse(self, line):
+        return None
+
+    def parse_batch(self, lines):
+        return [self.parse(line) for line in lines]
+
+
+class FastPathTier(ParserTier):
+    """Headers and plain "<number> <unit> <name>[, notes]" lines, split on whitespace instead of matched.
+
+    Like the line grammar, every line without digits is taken as a header,
+    scored by header_confidence. Records are the same as the grammar's. Lines with parentheses,
+    mixed numbers or multi-word units are left to the later tiers. Names are
+    only confirmed by the database's whole-phrase lookup, without scanning,
+    so an unconfirmed name scores 0.8 like an unknown one.
+    """
+
+    name = "fast"
+
+    def __init__(self, parser):
+        self.parser = parser
+
+    def parse(self, line):
+        if not has_digit(line):
+            # The grammar's header rule: no digits at all
+            return {"original": line, "quantity": None, "unit": None, "name": line, "notes": None,
+                    "is_header": True}, header_confidence(line)
+        parts = line.split(None, 2)
+        if len(parts) < 3 or "(" in parts[2] or not _QUANTITY_CHARS.issuperset(parts[0]) \
+                or parts[0][-1] == ".":
+            return None
+        unit = parts[1]
+        if unit not in UNIT_ALIASES:
+            if unit[-1] != "." or unit[:-1] not in UNIT_ALIASES:
+                return None
+            unit = unit[:-1]
+        quantity = parse_quantity(parts[0])
+        if quantity is None:
+            return None
+        rest = parts[2]
+        if rest[:3].lower() == "of " and rest[3:].strip():
+            rest = rest[3:]
+        name, comma, note = rest.partition(",")
+        name = " ".join(name.split())
+        if not name:
+            return None
+        confidence = 1.0 if self.parser.matcher.lookup_id(name) is not None else 0.8
+        return {"original": line, "quantity": quantity, "unit": unit.lower(), "name": name,
+                "notes": (note.strip() or None) if comma else None, "is_header": False}, confidence
+
+
+class GrammarTier(ParserTier):
+    """The full single-pass line grammar (RecipeParser._try_regex_parsing)."""
+
+    name = "regex"
+
+    def __init__(self, parser):
+        self.parser = parser
+
+    def parse(self, line):
+        record = self.parser._try_regex_parsing(line)
+        return record, record_confidence(record, self.parser)
+
+
+class DictionaryTier(ParserTier):
+    """Find a known ingredient and a quantity anywhere in the line, e.g. "Butter: 1/2 cup, softened" or "a pinch of salt"."""
+
+    name = "dictionary"
+
+    def __init__(self, parser):
+        self.parser = parser
+
+    def parse(self, line):
+        quantity, unit = find_quantity(line)
+        if quantity is None:
+            return None
+        parser = self.parser
+        index = parser.matcher.find_id(line)
+        if index is None:
+            return None
+        name = parser.ingredient_database[index]["name"].lower()
+        if unit is not None:
+            confidence = 0.9
+        elif parser.ingredient_database[index].get("gram_per_unit"):
+            confidence = 0.85
+        else:
+            confidence = 0.5
+        return {"original": line, "quantity": quantity, "unit": unit, "name": name, "notes": None,
+                "is_header": False}, confidence
+
+
+class TaggerTier(ParserTier):
+    """The token-classification tagger (see ingredient_tagger), on every remaining line as one batch.
+
+    get_tagger is called on first use, so the model loads only once a line
+    gets this far; if it returns None the tier doesn't apply, and neither
+    does it for a batch the tagger fails on (the first failure is printed),
+    so those lines still reach spaCy. Confidence is the record's database
+    score scaled by the tagger's own certainty.
+    """
+
+    name = "tagger"
+    slow = True
+
+    def __init__(self, parser, get_tagger):
+        self.parser = parser
+        self.get_tagger = get_tagger
+        self.failures = 0
+
+    def parse_batch(self, lines):
+        tagger = self.get_tagger()
+        if tagger is None:
+            return [None] * len(lines)
+        try:
+            tagged = tagger.tag(lines)
+        except Exception as e:
+            if not self.failures:
+                print(f"Warning: Ingredient tagger failed, falling back to spaCy: {e}")
+            self.failures += 1
+            return [None] * len(lines)
+        return [(record, record_confidence(record, self.parser) * certainty)
+                for record, certainty in tagged]
+
+
+class SpacyTier(ParserTier):
+    """spaCy parsing of every remaining line in one nlp.pipe pass (RecipeParser._try_nlp_parsing_batch)."""
+
+    name = "nlp"
+    slow = True
+
+    def __init__(self, parser):
+        self.parser = parser
+
+    def parse_batch(self, lines):
+        return [(record, record_confidence(record, self.parser))
+                for record in self.parser._try_nlp_parsing_batch(lines)]
+
+
+def default_tiers(parser, nlp=True, tagger=None):
+    """Return the standard tiers, cheapest first; spaCy last unless nlp is False.
+
+    tagger, a function returning an ingredient_tagger.IngredientTagger (or
+    None), adds a TaggerTier before spaCy.
+    """
+    tiers = [FastPathTier(parser), GrammarTier(parser), DictionaryTier(parser)]
+    if tagger is not None:
+        tiers.append(TaggerTier(parser, tagger))
+    if nlp:
+        tiers.append(SpacyTier(parser))
+    return tiers
+
+
+class ParserCascade:
+    """Run lines through parser tiers in order until one is confident enough.
+
+    Each tier only sees the lines no earlier tier reached threshold on, as
+    one batch. A line's result is the first one at or above threshold, or
+    else the most confident result any tier gave (the earlier one on ties).
+    Per-tier "<name>_tried" and "<name>" (accepted) counts, and
+    BEST_EFFORT, are added to a parser_stats.ParserStats; with timings on,
+    each tier's time is recorded as a stage under its name.
+
+    With quick=True, parse() stops at the first slow tier and returns None
+    for the lines that would have reached it.
+    """
+
+    def __init__(self, tiers, threshold=DEFAULT_THRESHOLD):
+        self.tiers = list(tiers)
+        self.threshold = threshold
+
+    def tier_names(self):
+        return [tier.name for tier in self.tiers]
+
+    def fingerprint(self, *extra):
+        """Return a short digest of the threshold, the tier classes and extra strings.
+
+        Cascades with the same fingerprint give the same results, so it can
+        key stored results (see RecipeParser.open_persistent_cache).
+        """
+        config = [repr(self.threshold)]
+        config += [f"{type(tier).__module__}.{type(tier).__qualname__}:{tier.name}" for tier in self.tiers]
+        config += extra
+        return hashlib.blake2b("\n".join(config).encode("utf-8"), digest_size=8).hexdigest()
+
+    def parse(self, lines, stats=None, quick=False):
+        """Return one record per line (None for lines left to slow tiers when quick)."""
+        best = [None] * len(lines)
+        confidences = [-1.0] * len(lines)
+        pending = list(range(len(lines)))
+        timing = stats is not None and stats.timings
+        for tier in self.tiers:
+            if not pending or quick and tier.slow:
+                break
+            start = perf_counter() if timing else 0
+            outcomes = tier.parse_batch([lines[index] for index in pending])
+            if timing:
+                stats.record(tier.name, perf_counter() - start, len(pending))
+            still_pending = []
+            for index, outcome in zip(pending, outcomes):
+                if outcome is not None:
+                    record, confidence = outcome
+                    if confidence > confidences[index]:
+                        best[index] = record
+                        confidences[index] = confidence
+                    if confidence >= self.threshold:
+                        continue
+                still_pending.append(index)
+            if stats is not None:
+                stats.add(f"{tier.name}_tried", len(pending))
+                stats.add(tier.name, len(pending) - len(still_pending))
+            pending = still_pending
+        if quick and pending and any(tier.slow for tier in self.tiers):
+            for index in pending:
+                best[index] = None
+            return best
+        if stats is not None:
+            stats.add(BEST_EFFORT, len(pending))
+        for index in pending:
+            if best[index] is None:
+                # No tier applied at all; keep the line as unparsed text
+                line = lines[index]
+                best[index] = {"original": line, "quantity": None, "unit": None, "name": line,
+                               "notes": None, "is_header": not has_digit(line)}
+        return best
+
+    def hit_rates(self, counters):
+        """Return {tier name: {"tried", "accepted", "hit_rate"}} from stats counters."""
+        rates = {}
+        for name in self.tier_names():
+            tried = counters.get(f"{name}_tried", 0)
+            accepted = counters.get(name, 0)
+            rates[name] = {"tried": tried, "accepted": accepted,
+                           "hit_rate": round(accepted / tried, 4) if tried else 0}
+        return rates
@@ -0,0 +1,235 @@
+# parser_stats.py
+from collections import Counter
+import atexit
+import cProfile
+import io
+import os
+import pstats
+import sys
+import threading
+import tracemalloc
+
+# PRECISION_BAKING_TIMINGS=1 turns on per-stage timing histograms.
+# PRECISION_BAKING_PROFILE=cprofile, tracemalloc or both (comma separated, or 1
+# for both) captures a profile of every parse/convert batch, reported at exit
+# or written to PRECISION_BAKING_PROFILE_OUTPUT (a pstats file).
+TIMINGS_ENV = "PRECISION_BAKING_TIMINGS"
+PROFILE_ENV = "PRECISION_BAKING_PROFILE"
+PROFILE_OUTPUT_ENV = "PRECISION_BAKING_PROFILE_OUTPUT"
+
+STAGES = ("fast", "regex", "dictionary", "tagger", "nlp", "db_match", "tokenize", "unit_conversion")
+
+# Which parser cascade tier (see parser_cascade) accepted each freshly parsed
+# line, or best_effort when none was confident enough, for path rates
+PARSE_PATHS = ("fast", "regex", "dictionary", "tagger", "nlp", "best_effort")
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").lower() in ("1", "true", "yes")
+
+
+class Histogram:
+    """Latency histogram with log2 buckets: bucket k counts timings under 2**k microseconds."""
+
+    __slots__ = ("count", "total", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.buckets = [0] * 32
+
+    def record(self, seconds, count=1):
+        """Add count observations that each took seconds."""
+        self.count += count
+        self.total += seconds * count
+        self.buckets[min(int(seconds * 1e6).bit_length(), 31)] += count
+
+    def percentile(self, fraction):
+        """Return the upper bound, in seconds, of the bucket holding the given fraction."""
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return (1 << bucket) / 1e6
+        return 0.0
+
+    def stats(self):
+        return {
+            "count": self.count,
+            "total_seconds": round(self.total, 6),
+            "mean_us": round(self.total / self.count * 1e6, 2) if self.count else 0,
+            "p50_us": self.percentile(0.5) * 1e6,
+            "p90_us": self.percentile(0.9) * 1e6,
+            "p99_us": self.percentile(0.99) * 1e6,
+            "buckets": {f"<{1 << bucket}us": count
+                        for bucket, count in enumerate(self.buckets) if count},
+        }
+
+
+class ParserHook:
+    """Receives instrumentation events from a RecipeParser; override what you need.
+
+    on_batch_start/on_batch_end surround each outermost parse_lines or
+    convert_lines call. on_stage is only sent while timings are enabled.
+    """
+
+    def on_batch_start(self, lines):
+        pass
+
+    def on_batch_end(self, lines, results):
+        pass
+
+    def on_stage(self, stage, seconds, count):
+        pass
+
+
+class ParserStats:
+    """Counters and per-stage timing histograms for one RecipeParser.
+
+    Counters are always kept and are updated once per batch where possible.
+    Timings cost two perf_counter calls per measured step, so they are off
+    unless requested (timings=True or PRECISION_BAKING_TIMINGS=1). Hooks are
+    only called when installed; with none the parser skips them entirely.
+    """
+
+    def __init__(self, timings=None):
+        self.timings = _env_flag(TIMINGS_ENV) if timings is None else timings
+        self.hooks = []
+        self._depth = 0
+        self.reset()
+
+    def reset(self):
+        self.counters = Counter()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+
+    def add_hook(self, hook):
+        self.hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self.hooks.remove(hook)
+
+    def add(self, counter, count=1):
+        self.counters[counter] += count
+
+    def record(self, stage, seconds, count=1):
+        """Record that a stage handled count items in seconds in total."""
+        histogram = self.histograms.get(stage)
+        if histogram is None:
+            # A stage outside STAGES, such as a custom parser tier
+            histogram = self.histograms[stage] = Histogram()
+        histogram.record(seconds / count, count)
+        for hook in self.hooks:
+            hook.on_stage(stage, seconds, count)
+
+    def run_batch(self, func, lines):
+        """Call func(lines), telling hooks when an outermost batch starts and ends."""
+        self._depth += 1
+        try:
+            outermost = self._depth == 1
+            if outermost:
+                for hook in self.hooks:
+                    hook.on_batch_start(lines)
+            results = func(lines)
+            if outermost:
+                for hook in self.hooks:
+                    hook.on_batch_end(lines, results)
+            return results
+        finally:
+            self._depth -= 1
+
+    def snapshot(self):
+        """Return counters, path and fallback rates, and timing histograms."""
+        parsed = self.counters["parsed"]
+        return {
+            "counters": dict(self.counters),
+            "path_rates": {path: round(self.counters[path] / parsed, 4) if parsed else 0
+                           for path in PARSE_PATHS},
+            # Share of freshly parsed lines that were sent to spaCy
+            "fallback_rate": round(self.counters["nlp_tried"] / parsed, 4) if parsed else 0,
+            "stages": {stage: histogram.stats()
+                       for stage, histogram in self.histograms.items() if histogram.count},
+        }
+
+
+class ProfileCapture(ParserHook):
+    """Hook that runs cProfile and/or tracemalloc during every parse batch.
+
+    One capture may be shared by several parsers; while batches overlap,
+    the profiler stays on from the first start to the last end.
+    """
+
+    def __init__(self, modes=("cprofile", "tracemalloc"), output=None):
+        self.modes = set(modes)
+        self.output = output
+        self.profiler = cProfile.Profile() if "cprofile" in self.modes else None
+        self.peak_bytes = 0
+        self.batches = 0
+        self._active = 0
+        self._lock = threading.Lock()
+
+    def on_batch_start(self, lines):
+        with self._lock:
+            self._active += 1
+            if self._active > 1:
+                return
+            if "tracemalloc" in self.modes:
+                if not tracemalloc.is_tracing():
+                    tracemalloc.start()
+                tracemalloc.reset_peak()
+            if self.profiler is not None:
+                self.profiler.enable()
+
+    def on_batch_end(self, lines, results):
+        with self._lock:
+            self.batches += 1
+            self._active -= 1
+            if self._active:
+                return
+            if self.profiler is not None:
+                self.profiler.disable()
+            if "tracemalloc" in self.modes:
+                self.peak_bytes = max(self.peak_bytes, tracemalloc.get_traced_memory()[1])
+
+    def report(self, stream=None, limit=25):
+        """Write the profile of every captured batch, or save it to self.output."""
+        if not self.batches:
+            return
+        stream = stream or sys.stderr
+        print(f"Profiled {self.batches} parse batches", file=stream)
+        if "tracemalloc" in self.modes:
+            print(f"Peak traced memory in a batch: {self.peak_bytes / 1024:.1f} KiB", file=stream)
+        if self.profiler is None:
+            return
+        if self.output:
+            self.profiler.dump_stats(self.output)
+            print(f"cProfile stats written to {self.output}", file=stream)
+        else:
+            text = io.StringIO()
+            pstats.Stats(self.profiler, stream=text).sort_stats("cumulative").print_stats(limit)
+            stream.write(text.getvalue())
+
+
+_profile = None
+_profile_lock = threading.Lock()
+
+
+def profile_from_env():
+    """Return the process's ProfileCapture configured by PRECISION_BAKING_PROFILE, or None if unset.
+
+    The capture is created (and its report registered to run at exit) on
+    the first call; every parser after that shares it.
+    """
+    global _profile
+    value = os.environ.get(PROFILE_ENV, "").lower()
+    if not value or value in ("0", "false", "no"):
+        return None
+    with _profile_lock:
+        if _profile is None:
+            if value in ("1", "true", "yes", "all"):
+                modes = ("cprofile", "tracemalloc")
+            else:
+                modes = [mode.strip() for mode in value.split(",") if mode.strip()]
+            _profile = ProfileCapture(modes, os.environ.get(PROFILE_OUTPUT_ENV) or None)
+            atexit.register(_profile.report)
+    return _profile
@@ -0,0 +1,159 @@
+# persistent_cache.py
+from contextlib import contextmanager
+import json
+import sqlite3
+import time
+
+from ingredient_table import database_digest
+
+# Part of every stored database version: bump it when the way a line is
+# parsed or converted changes, so results from older code are dropped.
+CACHE_FORMAT = 7
+
+# Rows read within this many seconds of their last use aren't touched again,
+# so a run made mostly of hits doesn't turn every read into a write.
+TOUCH_SECONDS = 3600
+
+# Keys per SQL statement; SQLite's historical limit on parameters is 999
+MAX_VARIABLES = 900
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lines (
+    line TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    db_version TEXT NOT NULL,
+    record TEXT NOT NULL,
+    used REAL NOT NULL,
+    PRIMARY KEY (line, mode)
+);
+CREATE INDEX IF NOT EXISTS lines_used ON lines (used);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def database_version(ingredient_database):
+    """Return a version string that changes whenever the database contents change."""
+    return f"{CACHE_FORMAT}-{database_digest(ingredient_database)}"
+
+
+class PersistentCache:
+    """Converted line results kept in a SQLite file, shared across runs and processes.
+
+    Rows are keyed by normalized line and parser mode ("regex", "nlp" or
+    "tagger" plus a fingerprint of the parser's configuration) and tagged
+    with the ingredient database version. Opening the cache with a
+    different version deletes every row from other versions. The file is in
+    WAL mode, so worker processes can keep reading while one of them writes,
+    and each batch of new results is written in a single transaction. When
+    the table grows past max_entries the least recently used rows go first.
+    """
+
+    def __init__(self, path, mode, db_version, max_entries=1000000, timeout=30.0):
+        self.path = path
+        self.mode = mode
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._unchecked = 0
+        # Autocommit; transactions are opened explicitly. RecipeParser calls
+        # are serialized, but may come from a different thread than this one.
+        self._connection = sqlite3.connect(path, timeout=timeout, isolation_level=None,
+                                           check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+        self.set_database_version(db_version)
+
+    @contextmanager
+    def _transaction(self):
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self._connection
+        except BaseException:
+            self._connection.execute("ROLLBACK")
+            raise
+        self._connection.execute("COMMIT")
+
+    def set_database_version(self, db_version):
+        """Use results for db_version only, deleting any stored for other versions."""
+        self.db_version = db_version
+        with self._transaction() as connection:
+            row = connection.execute("SELECT value FROM meta WHERE name = 'db_version'").fetchone()
+            if row is None or row[0] != db_version:
+                connection.execute("DELETE FROM lines WHERE db_version != ?", (db_version,))
+                connection.execute("INSERT OR REPLACE INTO meta VALUES ('db_version', ?)", (db_version,))
+
+    def get_many(self, keys):
+        """Return {key: record} for the normalized lines in keys that are stored."""
+        found = {}
+        stale = []
+        now = time.time()
+        unique = list(dict.fromkeys(keys))
+        for start in range(0, len(unique), MAX_VARIABLES):
+            chunk = unique[start:start + MAX_VARIABLES]
+            rows = self._connection.execute(
+                "SELECT line, record, used FROM lines WHERE mode = ? AND db_version = ? "
+                f"AND line IN ({','.join('?' * len(chunk))})",
+                (self.mode, self.db_version, *chunk))
+            for line, record, used in rows:
+                found[line] = json.loads(record)
+                if used < now - TOUCH_SECONDS:
+                    stale.append((now, line, self.mode))
+        self.hits += len(found)
+        self.misses += len(unique) - len(found)
+        if stale:
+            with self._transaction() as connection:
+                connection.executemany("UPDATE lines SET used = ? WHERE line = ? AND mode = ?", stale)
+        return found
+
+    def put_many(self, records):
+        """Store {key: record} for normalized lines, in one transaction."""
+        if not records:
+            return
+        now = time.time()
+        rows = [(key, self.mode, self.db_version, json.dumps(record, separators=(",", ":")), now)
+                for key, record in records.items()]
+        with self._transaction() as connection:
+            connection.executemany(
+                "INSERT OR REPLACE INTO lines (line, mode, db_version, record, used) VALUES (?, ?, ?, ?, ?)",
+                rows)
+        # Counting rows is a table scan, so the size is only checked after
+        # about 5% of max_entries new rows
+        self._unchecked += len(rows)
+        if self._unchecked >= max(1, self.max_entries // 20):
+            self.evict()
+
+    def evict(self):
+        """Delete the least recently used rows beyond max_entries."""
+        self._unchecked = 0
+        with self._transaction() as connection:
+            excess = connection.execute("SELECT count(*) FROM lines").fetchone()[0] - self.max_entries
+            if excess > 0:
+                connection.execute(
+                    "DELETE FROM lines WHERE rowid IN (SELECT rowid FROM lines ORDER BY used LIMIT ?)",
+                    (excess,))
+                self.evictions += excess
+
+    def clear(self):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM lines")
+
+    def __len__(self):
+        return self._connection.execute("SELECT count(*) FROM lines").fetchone()[0]
+
+    def stats(self):
+        """Return the cache counters as a dict."""
+        return {
+            "path": self.path,
+            "maxsize": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        self._connection.close()
@@ -1,11 +1,31 @@
 # main.py
-import re
-import csv
+from collections import deque
+import queue
+import threading
+import time
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import webbrowser
 from ingredient_database import INGREDIENT_DATABASE
+from ingredient_matcher import IngredientMatcher
+from line_grammar import parse_line
+from live_convert import LiveConverter
+from recipe_export import write_recipe_csv
 from recipe_parser import RecipeParser, update_app_with_new_parser
+from results_view import ResultsView
+from units import canonical_unit, conversion_factor
+
+# Conversion runs on a worker thread in chunks of this many lines; the Tk
+# loop polls for finished chunks every POLL_INTERVAL_MS and spends at most
+# FRAME_BUDGET_SECONDS per poll inserting rows, so the window stays responsive.
+CONVERT_CHUNK_LINES = 100
+POLL_INTERVAL_MS = 15
+FRAME_BUDGET_SECONDS = 0.03
+# Live mode converts edited lines once typing pauses for LIVE_DEBOUNCE_MS.
+# Edits touching more lines than LIVE_MAX_SYNC_LINES, and lines only the
+# tagger or spaCy can parse (which may load them), go to the worker thread.
+LIVE_DEBOUNCE_MS = 300
+LIVE_MAX_SYNC_LINES = 200
 
 class PrecisionBakingApp:
     def __init__(self, root):
@@ -14,6 +34,19 @@ class PrecisionBakingApp:
         self.root.geometry("900x700")
         self.root.minsize(800, 600)
         
+        self.ingredient_matcher = IngredientMatcher(INGREDIENT_DATABASE)
+        # Set by update_app_with_new_parser when a RecipeParser does the parsing
+        self.recipe_parser = None
+        
+        # State of the conversion running in the background, if any
+        self.conversion = None
+        # Created on the first conversion, then reused
+        self.results_view = None
+        # Live (as-you-type) conversion state
+        self.live = LiveConverter(self._convert_lines)
+        self.live_view = False  # whether the table mirrors the input line by line
+        self._live_after = None
+        
         self.setup_ui()
         
     def setup_ui(self):
@@ -59,12 +92,21 @@ class PrecisionBakingApp:
                                      command=lambda: self.recipe_input.delete(1.0, tk.END))
         self.clear_button.pack(side=tk.RIGHT, padx=(0, 10))
         
+        self.live_var = tk.BooleanVar(value=True)
+        live_check = ttk.Checkbutton(button_frame, text="Convert as I type", variable=self.live_var,
+                                     command=self._schedule_live_update)
+        live_check.pack(side=tk.LEFT)
+        
+        self.recipe_input.edit_modified(False)
+        self.recipe_input.bind("<<Modified>>", self._on_recipe_modified)
+        
         # Output frame
         self.output_frame = ttk.LabelFrame(self.root, text="Converted Recipe", padding="20")
         self.output_frame.grid(column=1, row=1, sticky=(tk.N, tk.W, tk.E, tk.S), padx=20, pady=20)
         
         # Initially hide the treeview and setup later when we have data
         self.setup_empty_output()
+        self._schedule_live_update()
         
         # Footer
         footer_frame = ttk.Frame(self.root, padding="20 0 20 20")
@@ -88,77 +130,37 @@ class PrecisionBakingApp:
         empty_label.pack(expand=True)
     
     def setup_results_output(self, results):
-        # Clear any existing widgets
-        for widget in self.output_frame.winfo_children():
-            widget.destroy()
-            
-        # Action buttons
-        btn_frame = ttk.Frame(self.output_frame)
-        btn_frame.pack(fill=tk.X, pady=(0, 10))
-        
-        save_btn = ttk.Button(btn_frame, text="Save as CSV", 
-                            command=lambda: self.save_as_csv(results))
-        save_btn.pack(side=tk.RIGHT, padx=5)
-        
-        # Create treeview for results
-        columns = ("ingredient", "original", "grams")
-        tree = ttk.Treeview(self.output_frame, columns=columns, show="headings", selectmode="none")
-        
-        # Define column headings
-        tree.heading("ingredient", text="Ingredient")
-        tree.heading("original", text="Original Measurement")
-        tree.heading("grams", text="Weight (g)")
-        
-        # Define column widths
-        tree.column("ingredient", width=150)
-        tree.column("original", width=150)
-        tree.column("grams", width=100)
-        
-        # Add data to the treeview
-        total_weight = 0
-        for item in results:
-            if item.get("is_header", False):
-                tree.insert("", tk.END, values=(item["original"], "", ""), tags=("header",))
-            else:
-                gram_weight = item.get("gram_weight", None)
-                gram_str = f"{gram_weight}g" if gram_weight is not None else "N/A"
-                tree.insert("", tk.END, values=(item["name"], item["original"], gram_str))
-                total_weight += gram_weight if gram_weight is not None else 0
-        
+        self.begin_results_output()
+        self.append_result_rows(results)
+        self.finish_results_output()
+    
+    def begin_results_output(self):
+        """Show an empty results table; rows are added with append_result_rows."""
+        if self.results_view is None:
+            # Build the results widgets once and reuse them for every conversion
+            for widget in self.output_frame.winfo_children():
+                widget.destroy()
+            self.results_view = ResultsView(self.output_frame, self.save_as_csv)
+        self.results_view.clear()
+    
+    def append_result_rows(self, items):
+        """Add converted ingredients to the results table."""
+        self.results_view.append(items)
+    
+    def finish_results_output(self):
         # Add total row
-        tree.insert("", tk.END, values=("", "", ""))
-        tree.insert("", tk.END, values=("TOTAL WEIGHT", "", f"{total_weight}g"), tags=("total",))
-        
-        # Style the treeview
-        style = ttk.Style()
-        style.configure("Treeview.Heading", font=("Helvetica", 10, "bold"))
-        style.configure("Treeview", font=("Helvetica", 10), rowheight=25)
-        style.map("Treeview", background=[("selected", "#f0f0f0")])
-        
-        # Configure tag styles
-        tree.tag_configure("header", background="#f0f0f0", font=("Helvetica", 10, "bold"))
-        tree.tag_configure("total", background="#e6e6e6", font=("Helvetica", 10, "bold"))
-        
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(self.output_frame, orient=tk.VERTICAL, command=tree.yview)
-        tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Pack the treeview and scrollbar
-        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Notes section
-        notes_frame = ttk.LabelFrame(self.output_frame, text="Precision Baking Notes")
-        notes_frame.pack(fill=tk.X, pady=(10, 0))
-        
-        notes_text = """• For best results, use a digital scale with 1g precision.
-• Room temperature for ingredients is assumed to be 21°C (70°F).
-• Weight conversions are approximate and based on standard densities."""
-        
-        ttk.Label(notes_frame, text=notes_text, justify=tk.LEFT, wraplength=400).pack(
-            anchor=tk.W, padx=10, pady=10)
+        self.results_view.finish()
     
     def convert_recipe(self):
+        if self.conversion is not None:
+            if self.conversion["live_edit"] is not None:
+                # Drop the live edit in progress and convert once it has stopped
+                self.conversion["cancel"].set()
+                self.conversion["convert_next"] = True
+            else:
+                self.cancel_conversion()
+            return
+        
         # Get recipe text
         recipe_text = self.recipe_input.get(1.0, tk.END).strip()
         
@@ -166,68 +168,202 @@ class PrecisionBakingApp:
             messagebox.showwarning("Empty Recipe", "Please enter a recipe to convert.")
             return
         
+        lines = [line.strip() for line in recipe_text.split('\n') if line.strip()]
+        self.live_view = False
+        self.begin_results_output()
+        self._start_conversion(lines, row=0)
+    
+    def _start_conversion(self, lines, row, live_edit=None):
+        """Convert lines on a worker thread, streaming them into the results from row on.
+        
+        live_edit is (start, old_end, lines, items, slow) when this finishes a
+        live edit: lines are converted into items at the indexes in slow, and
+        the table keeps its old rows until all of them are done.
+        """
+        conversion = {
+            "pending": deque(),     # converted rows not yet shown
+            "queue": queue.Queue(),  # messages from the worker thread
+            "cancel": threading.Event(),
+            "finished": False,
+            "row": row,             # where the next converted rows go
+            "live_edit": live_edit,
+            "items": [],            # everything converted, to update the live state
+            "convert_next": False,  # run convert_recipe once this stops
+        }
+        self.conversion = conversion
+        if live_edit is None:
+            self.convert_button.configure(text="Cancel")
+        
+        worker = threading.Thread(target=self._convert_in_background,
+                                  args=(lines, conversion["queue"], conversion["cancel"]),
+                                  daemon=True)
+        worker.start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_conversion)
+    
+    def cancel_conversion(self):
+        """Ask the running conversion to stop after its current chunk."""
+        if self.conversion is not None:
+            self.conversion["cancel"].set()
+            # Wait for the worker to stop before allowing a new conversion
+            self.convert_button.configure(text="Cancelling...", state=tk.DISABLED)
+    
+    def _convert_lines(self, lines):
+        """Parse and convert stripped, non-empty lines, returning one item per line."""
+        # Parse the lines
+        ingredients = self.parse_recipe_text("\n".join(lines))
+        
+        # Convert each ingredient to grams
+        for item in ingredients:
+            self._add_gram_weight(item)
+        
+        return ingredients
+    
+    def _add_gram_weight(self, item):
+        if not item.get("is_header", False) and item.get("quantity") is not None:
+            item["gram_weight"] = self.convert_to_grams(item)
+    
+    def _convert_in_background(self, lines, results_queue, cancel):
+        """Worker thread: parse and convert lines chunk by chunk, posting results to the queue."""
         try:
-            # Parse the recipe
-            ingredients = self.parse_recipe_text(recipe_text)
-            
-            # Convert each ingredient to grams
-            for item in ingredients:
-                if not item.get("is_header", False) and item.get("quantity") is not None:
-                    item["gram_weight"] = self.convert_to_grams(item)
-            
-            # Show results
-            self.setup_results_output(ingredients)
-            
+            for start in range(0, len(lines), CONVERT_CHUNK_LINES):
+                if cancel.is_set():
+                    results_queue.put(("cancelled", None))
+                    return
+                results_queue.put(("rows", self.live.convert(lines[start:start + CONVERT_CHUNK_LINES])))
+            results_queue.put(("done", None))
         except Exception as e:
-            messagebox.showerror("Error", f"An error occurred while converting: {str(e)}")
+            results_queue.put(("error", e))
+    
+    def _poll_conversion(self):
+        """Tk loop: show rows finished by the worker, within a per-frame time budget."""
+        conversion = self.conversion
+        deadline = time.perf_counter() + FRAME_BUDGET_SECONDS
+        
+        while True:
+            try:
+                kind, payload = conversion["queue"].get_nowait()
+            except queue.Empty:
+                break
+            if kind == "rows":
+                conversion["pending"].extend(payload)
+            elif kind == "error":
+                self._end_conversion(completed=False)
+                messagebox.showerror("Error", f"An error occurred while converting: {str(payload)}")
+                return
+            else:
+                conversion["finished"] = kind
+        
+        pending = conversion["pending"]
+        if conversion["live_edit"] is not None:
+            # Kept until the edit is complete, so the old rows stay in place
+            conversion["items"].extend(pending)
+            pending.clear()
+        while pending and time.perf_counter() < deadline:
+            batch = [pending.popleft() for _ in range(min(len(pending), 500))]
+            row = conversion["row"]
+            self.results_view.splice(row, row, batch)
+            conversion["row"] = row + len(batch)
+        
+        if conversion["finished"] and not pending:
+            if conversion["live_edit"] is None:
+                self.finish_results_output()
+            self._end_conversion(completed=conversion["finished"] == "done")
+        else:
+            self.root.after(POLL_INTERVAL_MS, self._poll_conversion)
+    
+    def _end_conversion(self, completed):
+        conversion = self.conversion
+        self.conversion = None
+        self.convert_button.configure(text="Convert to Grams", state=tk.NORMAL)
+        if conversion["live_edit"] is not None:
+            if completed:
+                start, old_end, lines, items, slow = conversion["live_edit"]
+                for index, item in zip(slow, conversion["items"]):
+                    items[index] = item
+                self.live.apply(start, old_end, lines, items)
+                self.results_view.splice(start, old_end, items)
+            else:
+                # The table no longer matches the text; rebuild on the next edit
+                self.live_view = False
+        if conversion["convert_next"]:
+            self.convert_recipe()
+    
+    def _on_recipe_modified(self, event=None):
+        if not self.recipe_input.edit_modified():
+            return  # the event fired for our own reset below
+        self.recipe_input.edit_modified(False)
+        self._schedule_live_update()
+    
+    def _schedule_live_update(self):
+        """Debounce typing: convert once the input has been quiet for LIVE_DEBOUNCE_MS."""
+        if not self.live_var.get():
+            return
+        if self._live_after is not None:
+            self.root.after_cancel(self._live_after)
+        self._live_after = self.root.after(LIVE_DEBOUNCE_MS, self._live_update)
+    
+    def _live_update(self):
+        """Re-convert only the lines edited since the last live update."""
+        self._live_after = None
+        if self.conversion is not None:
+            # Let the running conversion finish first
+            self._schedule_live_update()
+            return
+        
+        lines = self.recipe_input.get("1.0", "end-1c").split("\n")
+        if not self.live_view:
+            # The table shows a full conversion (or nothing); rebuild it line by line
+            self.begin_results_output()
+            self.finish_results_output()
+            self.live.reset()
+            self.live_view = True
+        
+        change = self.live.diff(lines)
+        if change is None:
+            return
+        start, old_end, new_end = change
+        changed = lines[start:new_end]
+        
+        if len(changed) > LIVE_MAX_SYNC_LINES:
+            # A large paste: convert it all in the background
+            items, slow = [None] * len(changed), list(range(len(changed)))
+        else:
+            items, slow = self._convert_quickly(changed)
+        if slow:
+            # Lines that need the tagger or spaCy; the rest are already converted
+            self._start_conversion([changed[index] for index in slow], row=start,
+                                   live_edit=(start, old_end, changed, items, slow))
+            return
+        
+        self.live.apply(start, old_end, changed, items)
+        self.results_view.splice(start, old_end, items)
+    
+    def _convert_quickly(self, lines):
+        """Convert lines as far as possible without running (or loading) the tagger or spaCy.
+        
+        Returns (items, slow): items as LiveConverter.convert gives them, with
+        None still at the indexes in slow, whose lines need the slow tiers.
+        """
+        parser = self.recipe_parser
+        if parser is None or parser.regex_only:
+            return self.live.convert(lines), []
+        stripped = [line.strip() for line in lines]
+        indexes = [index for index, line in enumerate(stripped) if line]
+        items = [None] * len(lines)
+        slow = []
+        parsed = parser.parse_lines([stripped[index] for index in indexes], quick=True) if indexes else []
+        for index, item in zip(indexes, parsed):
+            if item is None:
+                slow.append(index)
+            else:
+                self._add_gram_weight(item)
+                items[index] = item
+        return items, slow
     
     def parse_recipe_text(self, text):
         lines = [line.strip() for line in text.split('\n') if line.strip()]
-        results = []
-        
-        for line in lines:
-            # Regular expression to match quantity, unit, and ingredient
-            regex = r'^(?:(\d+(?:\.\d+)?(?:\s+\d+\/\d+)?|\d+\/\d+)\s+)?([a-zA-Z]+(?:\s+[a-zA-Z]+)?)?\s+(?:of\s+)?(.+)$'
-            match = re.match(regex, line)
-            
-            if not match:
-                results.append({
-                    "original": line,
-                    "quantity": None,
-                    "unit": None,
-                    "name": line,
-                    "is_header": not bool(re.search(r'\d', line))  # Assume lines without numbers are headers
-                })
-                continue
-            
-            quantity, unit, name = match.groups()
-            
-            # Convert quantity to float
-            if quantity:
-                if '/' in quantity:
-                    # Handle fractions
-                    parts = quantity.split()
-                    if len(parts) == 2:
-                        # Mixed number (e.g., "1 1/2")
-                        whole = float(parts[0])
-                        numerator, denominator = map(int, parts[1].split('/'))
-                        quantity = whole + (numerator / denominator)
-                    else:
-                        # Simple fraction (e.g., "1/2")
-                        numerator, denominator = map(int, quantity.split('/'))
-                        quantity = numerator / denominator
-                else:
-                    quantity = float(quantity)
-            
-            results.append({
-                "original": line,
-                "quantity": quantity,
-                "unit": unit.lower() if unit else None,
-                "name": name.strip(),
-                "is_header": False
-            })
-        
-        return results
+        # Same single-pass grammar RecipeParser uses for its regex path
+        return [parse_line(line) for line in lines]
     
     def convert_to_grams(self, ingredient):
         if ingredient.get("is_header", False) or ingredient.get("quantity") is None:
@@ -235,76 +371,57 @@ class PrecisionBakingApp:
         
         quantity = ingredient["quantity"]
         unit = ingredient["unit"]
-        name = ingredient["name"]
         
         # Find the ingredient in the database
-        ingredient_data = None
-        for item in INGREDIENT_DATABASE:
-            if name.lower() in item["name"].lower() or item["name"].lower() in name.lower():
-                ingredient_data = item
-                break
+        ingredient_data = self.ingredient_matcher.match(ingredient["name"])
         
         if not ingredient_data:
             return None  # Unknown ingredient
         
-        # If unit is already grams, return the quantity
-        if unit in ['g', 'gram', 'grams']:
-            return quantity
-        
-        # Convert based on the unit
-        if unit in ['cup', 'cups']:
-            return round(quantity * ingredient_data["gram_per_cup"])
-        elif unit in ['tablespoon', 'tablespoons', 'tbsp']:
-            return round(quantity * ingredient_data["gram_per_tablespoon"])
-        elif unit in ['teaspoon', 'teaspoons', 'tsp']:
-            return round(quantity * ingredient_data["gram_per_teaspoon"])
-        elif unit in ['oz', 'ounce', 'ounces']:
-            return round(quantity * 28.35)  # 1 oz = 28.35g
-        elif unit in ['lb', 'pound', 'pounds']:
-            return round(quantity * 453.59)  # 1 lb = 453.59g
-        elif unit in ['ml', 'milliliter', 'milliliters']:
-            if ingredient_data["type"] == "liquid":
-                return round(quantity)  # 1ml of water = 1g
-            else:
-                return round(quantity * ingredient_data.get("density", 1))
-        elif unit is None and name.lower() in ["egg", "eggs"]:
-            # Handle eggs as a special case
-            return round(quantity * 50)  # Assume 50g per egg
-        else:
+        # Grams per unit from the shared unit registry
+        factor = conversion_factor(ingredient_data, canonical_unit(unit))
+        if factor is None:
             return None  # Unknown unit
+        return round(quantity * factor)
     
     def save_as_csv(self, results):
         filename = filedialog.asksaveasfilename(
             defaultextension=".csv",
-            filetypes=[("CSV files", "*.csv"), ("All files", "*.*")],
+            filetypes=[("CSV files", "*.csv"), ("TSV files", "*.tsv"), ("JSON Lines", "*.jsonl"),
+                       ("Gzipped CSV", "*.csv.gz"), ("All files", "*.*")],
             title="Save Recipe as CSV"
         )
         
         if not filename:
             return  # User cancelled
         
+        # The file is written on a worker thread so a long recipe doesn't
+        # freeze the window; the format follows the file extension.
+        results_queue = queue.Queue()
+        worker = threading.Thread(target=self._save_in_background,
+                                  args=(filename, results, results_queue),
+                                  daemon=True)
+        worker.start()
+        self.root.after(POLL_INTERVAL_MS, self._poll_save, filename, results_queue)
+    
+    def _save_in_background(self, filename, results, results_queue):
+        """Worker thread: write the export, then post the outcome to the queue."""
         try:
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(["Ingredient", "Original Measurement", "Weight (g)"])
-                
-                for item in results:
-                    if item.get("is_header", False):
-                        writer.writerow([item["original"], "", ""])
-                    else:
-                        gram_weight = item.get("gram_weight")
-                        gram_str = f"{gram_weight}" if gram_weight is not None else "N/A"
-                        writer.writerow([item["name"], item["original"], gram_str])
-                
-                # Add total weight
-                total = sum(item.get("gram_weight", 0) or 0 for item in results)
-                writer.writerow(["", "", ""])
-                writer.writerow(["TOTAL WEIGHT", "", total])
-            
-            messagebox.showinfo("Success", f"Recipe saved to {filename}")
-        
+            results_queue.put(("done", write_recipe_csv(filename, results)))
         except Exception as e:
-            messagebox.showerror("Error", f"Failed to save file: {str(e)}")
+            results_queue.put(("error", e))
+    
+    def _poll_save(self, filename, results_queue):
+        """Tk loop: report the save once the worker thread has finished."""
+        try:
+            kind, payload = results_queue.get_nowait()
+        except queue.Empty:
+            self.root.after(POLL_INTERVAL_MS, self._poll_save, filename, results_queue)
+            return
+        if kind == "error":
+            messagebox.showerror("Error", f"Failed to save file: {str(payload)}")
+        else:
+            messagebox.showinfo("Success", f"Recipe saved to {filename}")
     
     def show_help(self):
         help_text = """Precision Baking - Usage Instructions
@@ -312,7 +429,8 @@ class PrecisionBakingApp:
 1. Enter your recipe in the text box on the left.
 2. Each ingredient should be on a separate line.
 3. Use standard measurements like cups, tablespoons, etc.
-4. Click "Convert to Grams" to see the precise gram weights.
+4. Results update as you type while "Convert as I type" is checked;
+   otherwise click "Convert to Grams" to see the precise gram weights.
 5. Save your converted recipe as a CSV file using the "Save as CSV" button.
 
 Example format:
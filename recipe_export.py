@@ -0,0 +1,173 @@
+# recipe_export.py
+import csv
+import gzip
+import io
+import json
+import os
+
+CSV_HEADER = ["Ingredient", "Original Measurement", "Weight (g)"]
+
+FORMATS = ("csv", "tsv", "jsonl")
+
+# Formatted rows are collected in memory and written to the file in chunks
+# of about this many characters, so a large export is a few big writes
+# instead of one per row, and memory stays flat however many rows there are.
+CHUNK_SIZE = 1 << 16
+
+
+def export_format(path):
+    """Return (format, gzip) for an export path from its extension, e.g. "out.jsonl.gz"."""
+    compress = path.lower().endswith(".gz")
+    if compress:
+        path = path[:-len(".gz")]
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    return (extension if extension in FORMATS else "csv"), compress
+
+
+class RecipeExporter:
+    """Stream converted recipes to a CSV, TSV or JSONL file, optionally gzipped.
+
+    Recipes are written one at a time with write_recipe() and each one's
+    results may be any iterable, such as RecipeParser.iter_parse(), so
+    exporting millions of rows never holds more than a chunk of them.
+    Weights are totalled while the rows are written, per recipe and for
+    the whole export.
+
+    CSV and TSV rows match "Save as CSV": a header, one row per ingredient,
+    then a blank row and the recipe's TOTAL WEIGHT. With recipe_column the
+    recipe id is added as a first column and the header is written once.
+    JSONL has one object per ingredient and a {"type": "total"} object
+    after each recipe.
+    """
+
+    def __init__(self, target, fmt=None, compress=None, recipe_column=False, chunk_size=CHUNK_SIZE):
+        if isinstance(target, str):
+            guessed_format, guessed_compress = export_format(target)
+            fmt = fmt or guessed_format
+            compress = guessed_compress if compress is None else compress
+            if compress:
+                self._file = gzip.open(target, "wt", encoding="utf-8", newline="")
+            else:
+                self._file = open(target, "w", encoding="utf-8", newline="")
+            self._owns_file = True
+        else:
+            # An open text file; compression is up to the caller
+            self._file = target
+            self._owns_file = False
+        fmt = fmt or "csv"
+        if fmt not in FORMATS:
+            raise ValueError(f"unknown export format {fmt!r}; expected one of {', '.join(FORMATS)}")
+        self.format = fmt
+        self.recipe_column = recipe_column
+        self.chunk_size = chunk_size
+        self.recipes = 0
+        self.rows = 0
+        self.total_weight = 0
+        self._buffer = io.StringIO()
+        if fmt == "jsonl":
+            self._writer = None
+        else:
+            self._writer = csv.writer(self._buffer, delimiter="\t" if fmt == "tsv" else ",")
+        self._wrote_header = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def write_recipe(self, results, recipe_id=None):
+        """Write one converted recipe and return its total weight in grams."""
+        if self._writer is None:
+            total = self._write_jsonl(results, recipe_id)
+        else:
+            total = self._write_rows(results, recipe_id)
+        self.recipes += 1
+        self.total_weight += total
+        return total
+
+    def _write_rows(self, results, recipe_id):
+        writerow = self._writer.writerow
+        prefix = [recipe_id if recipe_id is not None else ""] if self.recipe_column else []
+        if not (self.recipe_column and self._wrote_header):
+            writerow((["Recipe"] if self.recipe_column else []) + CSV_HEADER)
+            self._wrote_header = True
+        total = 0
+        for item in results:
+            if item.get("is_header", False):
+                writerow(prefix + [item["original"], "", ""])
+            else:
+                gram_weight = item.get("gram_weight")
+                writerow(prefix + [item["name"], item["original"],
+                                   gram_weight if gram_weight is not None else "N/A"])
+            total += item.get("gram_weight", 0) or 0
+            self.rows += 1
+            if self._buffer.tell() >= self.chunk_size:
+                self._flush()
+        writerow(prefix + ["", "", ""])
+        writerow(prefix + ["TOTAL WEIGHT", "", total])
+        return total
+
+    def _write_jsonl(self, results, recipe_id):
+        write = self._buffer.write
+        total = 0
+        for item in results:
+            record = {"type": "ingredient"}
+            if recipe_id is not None:
+                record["recipe"] = recipe_id
+            if item.get("is_header", False):
+                record["header"] = item["original"]
+            else:
+                record["ingredient"] = item["name"]
+                record["original"] = item["original"]
+                record["quantity"] = item.get("quantity")
+                record["unit"] = item.get("unit")
+                record["grams"] = item.get("gram_weight")
+            write(json.dumps(record, ensure_ascii=False))
+            write("\n")
+            total += item.get("gram_weight", 0) or 0
+            self.rows += 1
+            if self._buffer.tell() >= self.chunk_size:
+                self._flush()
+        record = {"type": "total", "grams": total}
+        if recipe_id is not None:
+            record["recipe"] = recipe_id
+        write(json.dumps(record, ensure_ascii=False))
+        write("\n")
+        return total
+
+    def _flush(self):
+        self._file.write(self._buffer.getvalue())
+        self._buffer.seek(0)
+        self._buffer.truncate()
+
+    def stats(self):
+        """Return the recipe, row and total weight counts written so far."""
+        return {"recipes": self.recipes, "rows": self.rows, "total_weight": self.total_weight}
+
+    def close(self):
+        self._flush()
+        if self._owns_file:
+            self._file.close()
+        else:
+            self._file.flush()
+
+
+def export_recipes(target, recipes, fmt=None, compress=None, recipe_column=True, cancel=None):
+    """Stream (recipe_id, results) pairs into one export file and return the exporter's stats.
+
+    cancel is an optional threading.Event checked between recipes.
+    """
+    with RecipeExporter(target, fmt, compress, recipe_column) as exporter:
+        for recipe_id, results in recipes:
+            if cancel is not None and cancel.is_set():
+                break
+            exporter.write_recipe(results, recipe_id)
+    return exporter.stats()
+
+
+def write_recipe_csv(filename, results):
+    """Write one converted recipe to a file in "Save as CSV" format (or TSV, JSONL, .gz by extension)."""
+    with RecipeExporter(filename) as exporter:
+        exporter.write_recipe(results)
+    return exporter.total_weight
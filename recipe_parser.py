@@ -1,111 +1,356 @@
 ﻿from ingredient_database import INGREDIENT_DATABASE
+from ingredient_tagger import load_tagger, tagger_path
+from fuzzy_index import MIN_SCORE as FUZZY_MIN_SCORE, FuzzyMatcher
+from ingredient_matcher import IngredientMatcher, normalize_name
+from line_grammar import parse_line, parse_quantity
+from units import canonical_unit, conversion_factor, is_unit
+from parser_cascade import DEFAULT_THRESHOLD, ParserCascade, default_tiers
+from parse_cache import LRUCache, freeze_record, normalize_line, recipe_key, thaw_record
+from parser_stats import ParserStats, profile_from_env
+from persistent_cache import PersistentCache, database_version
+from recipe_scaling import ScalableRecipe
+from recipe_stream import iter_lines
+from collections import Counter
+from itertools import islice
+import os
 import re
-import nltk
-from nltk.tokenize import word_tokenize
-import spacy
-from transformers import AutoTokenizer, AutoModelForSequenceClassification
-import torch
+import sys
+from time import perf_counter
 
-# Download necessary NLTK data
-try:
-    nltk.data.find('tokenizers/punkt')
-except LookupError:
-    nltk.download('punkt')
+# Heavy NLP backends (spaCy, NLTK, the transformers/torch tagger) are loaded lazily on
+# first real use through the get_* accessors below, never at import time.
+# Setting PRECISION_BAKING_REGEX_ONLY=1 keeps the parser on the regex path so
+# none of them is ever imported.
+REGEX_ONLY = os.environ.get("PRECISION_BAKING_REGEX_ONLY", "").lower() in ("1", "true", "yes")
 
-# Load spaCy model
-try:
-    nlp = spacy.load("en_core_web_sm")
-except:
-    # If the model isn't installed, download it
-    import subprocess
-    subprocess.run(["python", "-m", "spacy", "download", "en_core_web_sm"])
-    nlp = spacy.load("en_core_web_sm")
+_nlp = None
+_word_tokenize = None
+_tagger = None
 
-# Load a small LLM for ingredient extraction
-try:
-    tokenizer = AutoTokenizer.from_pretrained("distilbert-base-uncased")
-    model = AutoModelForSequenceClassification.from_pretrained("distilbert-base-uncased-finetuned-sst-2-english")
-except:
-    print("Warning: Could not load transformer model. LLM fallback will not be available.")
-    tokenizer = None
-    model = None
+def get_nlp():
+    """Return the spaCy pipeline, loading it on first use."""
+    global _nlp
+    if _nlp is None:
+        import spacy
+        try:
+            _nlp = spacy.load("en_core_web_sm")
+        except OSError:
+            # If the model isn't installed, download it
+            import subprocess
+            subprocess.run([sys.executable, "-m", "spacy", "download", "en_core_web_sm"])
+            _nlp = spacy.load("en_core_web_sm")
+    return _nlp
+
+def get_word_tokenize():
+    """Return NLTK's word_tokenize, fetching the punkt data on first use."""
+    global _word_tokenize
+    if _word_tokenize is None:
+        import nltk
+        from nltk.tokenize import word_tokenize
+        try:
+            nltk.data.find('tokenizers/punkt')
+        except LookupError:
+            nltk.download('punkt')
+        _word_tokenize = word_tokenize
+    return _word_tokenize
+
+def get_tagger():
+    """Return the ingredient tagger from PRECISION_BAKING_TAGGER, or None if unset or unloadable."""
+    global _tagger
+    if _tagger is None:
+        path = tagger_path()
+        if path is None:
+            return None
+        try:
+            _tagger = load_tagger(path)
+        except Exception as e:
+            print(f"Warning: Could not load ingredient tagger from {path}: {e}")
+            _tagger = False
+    return _tagger or None
+
+def loaded_backends():
+    """Return the names of the heavy backends that have been imported so far."""
+    return [name for name in ("spacy", "nltk", "torch", "transformers") if name in sys.modules]
+
+# Trigram candidates ranked against word matches for names with no exact match
+FUZZY_CANDIDATES = 5
+
+# Name-cache value for names known not to be in the database
+UNKNOWN_INGREDIENT = -1
 
 class RecipeParser:
-    def __init__(self, ingredient_database=INGREDIENT_DATABASE):
-        self.ingredient_database = ingredient_database
-        self.ingredient_names = [item["name"].lower() for item in ingredient_database]
+    def __init__(self, ingredient_database=INGREDIENT_DATABASE, regex_only=None,
+                 nlp_batch_size=64, nlp_n_process=1, line_cache_size=4096, recipe_cache_size=256,
+                 name_cache_size=4096, stats=None, confidence_threshold=DEFAULT_THRESHOLD, tiers=None):
+        # In regex-only mode lines the regexes can't fully parse are kept as-is
+        # instead of falling back to spaCy, and NLTK tokenization is replaced
+        # by a plain word split.
+        self.regex_only = REGEX_ONLY if regex_only is None else regex_only
+        # Lines needing the NLP fallback are sent through nlp.pipe together
+        self.nlp_batch_size = nlp_batch_size
+        self.nlp_n_process = nlp_n_process
+        # New lines go through parser tiers (fast path, grammar, dictionary,
+        # the tagger if PRECISION_BAKING_TAGGER is set, spaCy) until one is at
+        # least confidence_threshold sure; see parser_cascade. tiers replaces
+        # the default list.
+        self.use_tagger = not self.regex_only and tagger_path() is not None
+        if tiers is None:
+            tiers = default_tiers(self, nlp=not self.regex_only,
+                                  tagger=get_tagger if self.use_tagger else None)
+        self.cascade = ParserCascade(tiers, confidence_threshold)
+        # Parsed results are cached per normalized line and per whole recipe.
+        # Entries are stored frozen and handed out as fresh dicts, so callers
+        # may add keys such as gram_weight without corrupting the cache.
+        self.line_cache = LRUCache(line_cache_size)
+        self.recipe_cache = LRUCache(recipe_cache_size)
+        # Converted recipes kept for rescaling (see scalable_recipe)
+        self.scaling_cache = LRUCache(recipe_cache_size)
+        # Normalized ingredient name -> database index, or UNKNOWN_INGREDIENT
+        # so names that can't be resolved aren't searched for again.
+        self.name_cache = LRUCache(name_cache_size)
+        self.unresolved_names = Counter()
+        # Optional on-disk cache of converted lines; see open_persistent_cache()
+        self.persistent_cache = None
+        # Path counters and per-stage timings (see parser_stats); when
+        # PRECISION_BAKING_PROFILE is set, the process's one profile capture
+        # is added as a hook, so all parsers report together at exit.
+        self.stats = stats if stats is not None else ParserStats()
+        profile = profile_from_env()
+        if profile is not None and profile not in self.stats.hooks:
+            self.stats.add_hook(profile)
+        self.reload_database(ingredient_database)
+    
+    def reload_database(self, ingredient_database=None):
+        """Rebuild the matcher for a new or modified database and drop stale caches."""
+        if ingredient_database is not None:
+            self.ingredient_database = ingredient_database
+        # Snapshot tables (see ingredient_snapshot) come with a prebuilt matcher
+        make_matcher = getattr(self.ingredient_database, "matcher", None)
+        self.matcher = make_matcher() if make_matcher is not None else IngredientMatcher(self.ingredient_database)
+        # Only needed for names the matcher can't find; built on first use
+        self._fuzzy_matcher = None
+        self._database_signature = self._get_database_signature()
+        self.clear_caches()
+        if self.persistent_cache is not None:
+            self.persistent_cache.set_database_version(database_version(self.ingredient_database))
+    
+    def open_persistent_cache(self, path, max_entries=1000000):
+        """Keep converted lines in a SQLite file at path, shared with other runs and processes.
+        
+        Results are stored per parser mode and ingredient database version;
+        after a database change (or reload_database()) old results are dropped.
+        The mode includes a fingerprint of the confidence threshold, the
+        parser tiers and the tagger checkpoint, so differently configured
+        parsers sharing the file don't get each other's results.
+        """
+        kind = "regex" if self.regex_only else "tagger" if self.use_tagger else "nlp"
+        mode = f"{kind}-{self.cascade.fingerprint(tagger_path() if self.use_tagger else '')}"
+        self.persistent_cache = PersistentCache(path, mode, database_version(self.ingredient_database),
+                                                max_entries)
+        return self.persistent_cache
+    
+    def _get_database_signature(self):
+        # Snapshot tables are read-only and carry a content hash (see
+        # ingredient_table.database_digest); other databases are hashed by
+        # value, so edits to existing entries are noticed as well as a swapped
+        # database or entries added/removed.
+        content_hash = getattr(self.ingredient_database, "content_hash", None)
+        if content_hash is not None:
+            return content_hash
+        return hash(tuple(tuple(item.items()) for item in self.ingredient_database))
+    
+    def _check_database(self):
+        """Reload the database if it changed since the last check.
+        
+        Hashing the database costs more than a name lookup, so this runs
+        once per public parse or convert call rather than per ingredient.
+        """
+        if self._get_database_signature() != self._database_signature:
+            self.reload_database()
     
     def parse_recipe_text(self, text):
         """Parse recipe text into structured ingredients data using multiple methods."""
+        self._check_database()
+        key = recipe_key(text)
+        cached = self.recipe_cache.get(key)
+        if cached is not None:
+            return [thaw_record(record) for record in cached]
+        
         lines = [line.strip() for line in text.split('\n') if line.strip()]
+        results = self._parse_batch(lines)
+        self.recipe_cache.put(key, tuple(freeze_record(result) for result in results))
+        return results
+    
+    def scalable_recipe(self, text):
+        """Parse and convert recipe text once into a ScalableRecipe that rescales without re-parsing."""
+        self._check_database()
+        key = recipe_key(text)
+        recipe = self.scaling_cache.get(key)
+        if recipe is None:
+            recipe = ScalableRecipe.from_ingredients(self.parse_recipe_text(text), self)
+            self.scaling_cache.put(key, recipe)
+        return recipe
+    
+    def parse_lines(self, lines, quick=False):
+        """Parse stripped, non-empty recipe lines, batching the NLP fallback.
+        
+        With quick=True the tagger and spaCy are never run (or loaded): lines
+        only they could parse come back as None and aren't cached.
+        """
+        self._check_database()
+        return self._parse_batch(lines, quick)
+    
+    def _parse_batch(self, lines, quick=False):
+        if self.stats.hooks:
+            return self.stats.run_batch(lambda lines: self._parse_lines(lines, quick), lines)
+        return self._parse_lines(lines, quick)
+    
+    def _parse_lines(self, lines, quick=False):
+        stats = self.stats
         results = []
+        parsed_indices = {}  # normalized line -> index of its first occurrence
+        repeated_indices = []
+        new_lines = []
+        cache_hits = 0
         
         for line in lines:
-            # Try multiple parsing methods
-            result = self._try_regex_parsing(line)
-            
-            if not result or result.get("quantity") is None or result.get("unit") is None:
-                # Fallback to NLP-based parsing
-                result = self._try_nlp_parsing(line)
+            key = normalize_line(line)
+            cached = self.line_cache.get(key)
+            if cached is not None:
+                result = thaw_record(cached)
+                result["original"] = line
+                results.append(result)
+                cache_hits += 1
+                continue
+            if key in parsed_indices:
+                # Same line seen earlier in this batch; copy it once parsed
+                repeated_indices.append((len(results), parsed_indices[key]))
+                results.append(None)
+                continue
             
-            results.append(result)
+            parsed_indices[key] = len(results)
+            new_lines.append(line)
+            results.append(None)
         
+        # Lines not seen before go through the tiers as one batch, so every
+        # line that reaches spaCy is parsed in a single nlp.pipe pass
+        if new_lines:
+            for index, result in zip(parsed_indices.values(), self.cascade.parse(new_lines, stats, quick)):
+                results[index] = result
+        
+        for key, index in parsed_indices.items():
+            if results[index] is not None:
+                self.line_cache.put(key, freeze_record(results[index]))
+        
+        for index, first_index in repeated_indices:
+            if results[first_index] is not None:
+                results[index] = dict(results[first_index], original=lines[index])
+        
+        counters = stats.counters
+        counters["lines"] += len(lines)
+        counters["line_cache"] += cache_hits
+        counters["repeat"] += len(repeated_indices)
+        counters["parsed"] += len(new_lines)
         return results
     
-    def _try_regex_parsing(self, line):
-        """Try to parse the ingredient line using regex patterns."""
-        # Pattern 1: Standard format with quantity, unit, and name
-        pattern1 = r'^([\d/\.\s]+)\s+([\w\s]+?)\s+([\w\s,]+)$'
-        # Pattern 2: Format with quantity directly followed by ingredient
-        pattern2 = r'^([\d/\.\s]+)\s+([\w\s,]+)$'
+    def convert_lines(self, lines):
+        """Parse lines and add each result's gram_weight (None if it can't be converted)."""
+        self._check_database()
+        if self.stats.hooks:
+            return self.stats.run_batch(self._convert_lines, lines)
+        return self._convert_lines(lines)
+    
+    def _convert_lines(self, lines):
+        if self.persistent_cache is not None:
+            return self._convert_lines_cached(lines)
+        results = self._parse_batch(lines)
+        for item in results:
+            item["gram_weight"] = self.convert_to_grams(item)
+        return results
+    
+    def _convert_lines_cached(self, lines):
+        """convert_lines through the persistent cache; only lines it lacks are parsed."""
+        keys = [normalize_line(line) for line in lines]
+        stored = self.persistent_cache.get_many(keys)
+        self.stats.counters["persistent_cache"] += len(stored)
         
-        match = re.match(pattern1, line)
-        if match:
-            quantity_str, unit, name = match.groups()
-            quantity = self._parse_quantity(quantity_str)
-            return {
-                "original": line,
-                "quantity": quantity,
-                "unit": unit.strip().lower(),
-                "name": name.strip(),
-                "is_header": False
-            }
+        missing = [index for index, key in enumerate(keys) if key not in stored]
+        results = [None] * len(lines)
+        if missing:
+            converted = self._parse_batch([lines[index] for index in missing])
+            new_records = {}
+            for index, item in zip(missing, converted):
+                item["gram_weight"] = self.convert_to_grams(item)
+                results[index] = item
+                new_records[keys[index]] = {name: value for name, value in item.items() if name != "original"}
+            self.persistent_cache.put_many(new_records)
         
-        match = re.match(pattern2, line)
-        if match:
-            quantity_str, name = match.groups()
-            quantity = self._parse_quantity(quantity_str)
-            # For eggs, the unit is 'eggs'
-            if 'egg' in name.lower() and 'white' not in name.lower() and 'yolk' not in name.lower():
-                return {
-                    "original": line,
-                    "quantity": quantity,
-                    "unit": None,
-                    "name": "eggs",
-                    "is_header": False
-                }
-            
-            return {
-                "original": line,
-                "quantity": quantity,
-                "unit": None,
-                "name": name.strip(),
-                "is_header": False
-            }
+        for index, key in enumerate(keys):
+            if results[index] is None:
+                results[index] = dict(stored[key], original=lines[index])
+        return results
+    
+    def iter_parse(self, source, chunk_size=None):
+        """Yield parsed and converted ingredients one at a time from a large input.
         
-        # If no patterns match, it might be a header or unstructured text
+        source is a file path, file object or iterable of lines (see
+        recipe_stream.iter_lines). Lines are handled in chunks of chunk_size
+        (default nlp_batch_size) so the NLP fallback stays batched while
+        memory use stays bounded regardless of input size.
+        """
+        chunk_size = chunk_size or self.nlp_batch_size
+        lines = iter_lines(source)
+        while True:
+            chunk = list(islice(lines, chunk_size))
+            if not chunk:
+                return
+            yield from self.convert_lines(chunk)
+    
+    def cache_stats(self):
+        """Return hit, miss and eviction counters for the parse caches."""
         return {
-            "original": line,
-            "quantity": None,
-            "unit": None,
-            "name": line,
-            "is_header": not bool(re.search(r'\d', line))  # Assume lines without numbers are headers
+            "line": self.line_cache.stats(),
+            "recipe": self.recipe_cache.stats(),
+            "scaling": self.scaling_cache.stats(),
+            "name": self.name_cache.stats(),
+            "persistent": self.persistent_cache.stats() if self.persistent_cache is not None else None,
         }
     
+    def parse_stats(self):
+        """Return parse path counters, per-tier hit rates, fallback rate, stage timings and cache counters."""
+        stats = self.stats.snapshot()
+        stats["tiers"] = self.cascade.hit_rates(self.stats.counters)
+        stats["cache"] = self.cache_stats()
+        return stats
+    
+    def clear_caches(self):
+        """Drop every cached parse and name-resolution result."""
+        self.line_cache.clear()
+        self.recipe_cache.clear()
+        self.scaling_cache.clear()
+        self.name_cache.clear()
+        self.unresolved_names.clear()
+    
+    def unresolved_report(self, limit=10):
+        """Return the most frequent ingredient names that could not be resolved."""
+        return self.unresolved_names.most_common(limit)
+    
+    def _try_regex_parsing(self, line):
+        """Parse the ingredient line with the shared single-pass line grammar."""
+        return parse_line(line)
+    
     def _try_nlp_parsing(self, line):
         """Use NLP techniques to parse the ingredient line."""
-        doc = nlp(line)
-        
+        return self._parse_doc(line, get_nlp()(line))
+    
+    def _try_nlp_parsing_batch(self, lines):
+        """Parse several lines with NLP, running them through nlp.pipe in batches."""
+        docs = get_nlp().pipe(lines, batch_size=self.nlp_batch_size, n_process=self.nlp_n_process)
+        # nlp.pipe yields docs in input order, so results line up with lines
+        return [self._parse_doc(line, doc) for line, doc in zip(lines, docs)]
+    
+    def _parse_doc(self, line, doc):
+        """Extract quantity, unit and ingredient name from a spaCy doc of line."""
         # Extract numbers (quantities)
         quantities = []
         for token in doc:
@@ -113,22 +358,16 @@ class RecipeParser:
                 quantities.append(token.text)
         
         # Extract potential units
-        common_units = ["cup", "cups", "tablespoon", "tablespoons", "tbsp", 
-                       "teaspoon", "teaspoons", "tsp", "oz", "ounce", "ounces", 
-                       "lb", "pound", "pounds", "g", "gram", "grams", 
-                       "ml", "milliliter", "milliliters"]
-        
         units = []
         for token in doc:
-            if token.text.lower() in common_units:
+            if is_unit(token.text):
                 units.append(token.text.lower())
         
         # Try to identify ingredient name
         ingredient_name = None
-        for ingredient in self.ingredient_names:
-            if ingredient in line.lower():
-                ingredient_name = ingredient
-                break
+        ingredient_id = self.matcher.find_id(line)
+        if ingredient_id is not None:
+            ingredient_name = self.ingredient_database[ingredient_id]["name"].lower()
         
         # If we couldn't find a known ingredient, use the remaining words
         if not ingredient_name:
@@ -162,100 +401,109 @@ class RecipeParser:
     
     def _parse_quantity(self, quantity_str):
         """Convert a quantity string to a float value."""
-        try:
-            if '/' in quantity_str:
-                # Handle fractions
-                parts = quantity_str.split()
-                if len(parts) > 1 and '/' in parts[1]:
-                    # Mixed number (e.g., "1 1/2")
-                    whole = float(parts[0])
-                    numerator, denominator = map(int, parts[1].split('/'))
-                    return whole + (numerator / denominator)
-                else:
-                    # Simple fraction (e.g., "1/2")
-                    for part in parts:
-                        if '/' in part:
-                            numerator, denominator = map(int, part.split('/'))
-                            return numerator / denominator
-            else:
-                return float(quantity_str)
-        except Exception as e:
-            print(f"Error parsing quantity '{quantity_str}': {str(e)}")
-            return None
+        return parse_quantity(quantity_str)
     
     def convert_to_grams(self, ingredient):
         """Convert ingredient to gram weight based on its quantity and unit."""
+        counters = self.stats.counters
         if ingredient.get("is_header", False) or ingredient.get("quantity") is None:
+            counters["convert_skipped"] += 1
             return None
         
         quantity = ingredient["quantity"]
         unit = ingredient["unit"]
-        name = ingredient["name"]
         
         # Find the ingredient in the database
-        ingredient_data = None
-        for item in self.ingredient_database:
-            if (name.lower() in item["name"].lower() or 
-                item["name"].lower() in name.lower() or
-                self._similarity_score(name.lower(), item["name"].lower()) > 0.7):
-                ingredient_data = item
-                break
-        
-        if not ingredient_data:
-            # Try to match with tokens
-            tokens = word_tokenize(name.lower())
-            for token in tokens:
-                if len(token) > 3:  # Only consider tokens with meaningful length
-                    for item in self.ingredient_database:
-                        if token in item["name"].lower():
-                            ingredient_data = item
-                            break
-                    if ingredient_data:
-                        break
+        ingredient_data = self.resolve_ingredient(ingredient["name"])
         
         if not ingredient_data:
+            counters["unknown_ingredient"] += 1
             return None  # Unknown ingredient
         
-        # If unit is already grams, return the quantity
-        if unit in ['g', 'gram', 'grams']:
-            return round(quantity)
-        
-        # Handle special case for eggs
-        if unit is None and (name.lower() == "eggs" or name.lower() == "egg"):
-            return round(quantity * 50)  # Assume 50g per egg
-        
-        # Convert based on the unit
-        if unit in ['cup', 'cups']:
-            return round(quantity * ingredient_data.get("gram_per_cup", 0))
-        elif unit in ['tablespoon', 'tablespoons', 'tbsp']:
-            return round(quantity * ingredient_data.get("gram_per_tablespoon", 0))
-        elif unit in ['teaspoon', 'teaspoons', 'tsp']:
-            return round(quantity * ingredient_data.get("gram_per_teaspoon", 0))
-        elif unit in ['oz', 'ounce', 'ounces']:
-            return round(quantity * 28.35)  # 1 oz = 28.35g
-        elif unit in ['lb', 'pound', 'pounds']:
-            return round(quantity * 453.59)  # 1 lb = 453.59g
-        elif unit in ['ml', 'milliliter', 'milliliters']:
-            if ingredient_data["type"] == "liquid":
-                return round(quantity)  # 1ml of water = 1g
-            else:
-                return round(quantity * ingredient_data.get("density", 1))
+        # Grams per unit: fixed for weights, ingredient-specific for volumes,
+        # and gram_per_unit (e.g. 50g per egg) when no unit is given
+        if self.stats.timings:
+            start = perf_counter()
+            factor = conversion_factor(ingredient_data, canonical_unit(unit))
+            self.stats.record("unit_conversion", perf_counter() - start)
         else:
+            factor = conversion_factor(ingredient_data, canonical_unit(unit))
+        if factor is None:
+            counters["unknown_unit"] += 1
             return None  # Unknown unit
+        counters["converted"] += 1
+        return round(quantity * factor)
     
-    def _similarity_score(self, text1, text2):
-        """Calculate a simple similarity score between two strings."""
-        # Simple Jaccard similarity
-        set1 = set(text1.split())
-        set2 = set(text2.split())
-        
-        if not set1 or not set2:
-            return 0
+    def resolve_ingredient(self, name):
+        """Return the database entry for an ingredient name, or None if unknown."""
+        index = self.resolve_ingredient_id(name)
+        return self.ingredient_database[index] if index is not None else None
+    
+    def resolve_ingredient_id(self, name):
+        """Return the database index for an ingredient name, or None if unknown.
         
-        intersection = len(set1.intersection(set2))
-        union = len(set1.union(set2))
+        Database edits are picked up by the next parse or convert call (or
+        reload_database()), not by each lookup.
+        """
+        start = perf_counter() if self.stats.timings else 0
+        key = normalize_name(name)
+        index = self.name_cache.get(key)
+        if index is None:
+            index = self._match_ingredient_id(key)
+            self.name_cache.put(key, UNKNOWN_INGREDIENT if index is None else index)
+        elif index == UNKNOWN_INGREDIENT:
+            index = None
         
-        return intersection / union
+        if index is None:
+            self.unresolved_names[key] += 1
+        if self.stats.timings:
+            self.stats.record("db_match", perf_counter() - start)
+        return index
+    
+    def fuzzy_matcher(self):
+        """Return the trigram index used to resolve misspelled names, building it if needed."""
+        if self._fuzzy_matcher is None:
+            self._fuzzy_matcher = FuzzyMatcher(self.ingredient_database, self.matcher)
+        return self._fuzzy_matcher
+    
+    def _match_ingredient_id(self, name):
+        """Search the database for name; the uncached path behind resolve_ingredient."""
+        index = self.matcher.match_id(name)
+        if index is not None:
+            return index
+        # No exact match: entries matching single words of the name ("flour"
+        # in "rice flour") and close trigram candidates (misspellings) are
+        # ranked together by similarity to the whole name, so "rice flour"
+        # goes to rye flour rather than whichever flour a word hits first.
+        # Word matches are kept even below FUZZY_MIN_SCORE.
+        fuzzy = self.fuzzy_matcher()
+        candidates = dict(fuzzy.top_k(name, FUZZY_CANDIDATES, FUZZY_MIN_SCORE))
+        word_matches = set()
+        for token in self._tokenize(name):
+            if len(token) > 3:  # Only consider tokens with meaningful length
+                token_index = self.matcher.match_id(token)
+                if token_index is not None:
+                    word_matches.add(token_index)
+        for token_index in word_matches:
+            if token_index not in candidates:
+                candidates[token_index] = fuzzy.names.score(name, token_index)
+        if not candidates:
+            return None
+        index = min(candidates.items(), key=lambda candidate: (-candidate[1], candidate[0]))[0]
+        if index not in word_matches:
+            self.stats.counters["fuzzy_match"] += 1
+        return index
+    
+    def _tokenize(self, text):
+        """Split text into word tokens, using NLTK unless in regex-only mode."""
+        start = perf_counter() if self.stats.timings else 0
+        if self.regex_only:
+            tokens = re.findall(r"[\w'-]+", text)
+        else:
+            tokens = get_word_tokenize()(text)
+        if self.stats.timings:
+            self.stats.record("tokenize", perf_counter() - start)
+        return tokens
 
 # Update the PrecisionBakingApp class to use this new parser
 def update_app_with_new_parser(app_class):
@@ -264,6 +512,7 @@ def update_app_with_new_parser(app_class):
     This function demonstrates how to integrate the new parser.
     """
     parser = RecipeParser()
+    app_class.recipe_parser = parser
     
     # Replace the parse_recipe_text method
     app_class.parse_recipe_text = parser.parse_recipe_text
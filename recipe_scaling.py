@@ -0,0 +1,118 @@
+# recipe_scaling.py
+from array import array
+import math
+
+from parse_cache import freeze_record, thaw_record
+from units import canonical_unit, conversion_factor
+
+NAN = float("nan")
+
+
+def is_flour(ingredient_data):
+    """Return True for database entries that count as flour in baker's percentages."""
+    return ingredient_data is not None and "flour" in ingredient_data["name"].lower()
+
+
+class ScalableRecipe:
+    """A parsed and converted recipe, kept so it can be rescaled with arithmetic only.
+
+    Each line keeps its parsed record, its quantity and the grams per unit
+    its ingredient and unit convert at, as parallel arrays (NaN where the
+    line has no quantity or can't be converted). Scaling multiplies the
+    quantities and applies the stored factors, rounding like
+    RecipeParser.convert_to_grams, so no line is parsed or matched again.
+    """
+
+    __slots__ = ("records", "quantities", "factors", "flour", "exact_weight", "flour_weight")
+
+    def __init__(self, records, quantities, factors, flour):
+        self.records = records        # frozen parsed lines (see parse_cache.freeze_record)
+        self.quantities = quantities  # array("d")
+        self.factors = factors        # array("d"), grams per one unit
+        self.flour = flour            # array("b"), 1 for flour lines
+        # Unrounded weights at multiplier 1, for the weight-based scalings
+        self.exact_weight = self._sum_weights()
+        self.flour_weight = self._sum_weights(flour_only=True)
+
+    @classmethod
+    def from_ingredients(cls, ingredients, parser):
+        """Build from parsed ingredient dicts, resolving names and units with parser."""
+        records = []
+        quantities = array("d")
+        factors = array("d")
+        flour = array("b")
+        for item in ingredients:
+            records.append(freeze_record(item))
+            quantity = item.get("quantity")
+            factor = None
+            ingredient_data = None
+            if not item.get("is_header", False) and quantity is not None:
+                ingredient_data = parser.resolve_ingredient(item["name"])
+                if ingredient_data:
+                    factor = conversion_factor(ingredient_data, canonical_unit(item["unit"]))
+            quantities.append(quantity if quantity is not None else NAN)
+            factors.append(factor if factor is not None else NAN)
+            flour.append(factor is not None and is_flour(ingredient_data))
+        return cls(tuple(records), quantities, factors, flour)
+
+    def __len__(self):
+        return len(self.records)
+
+    def gram_weights(self, multiplier=1.0):
+        """Return each line's weight in grams at multiplier, or None where it can't be converted."""
+        # NaN is the only value not equal to itself
+        return [round(quantity * multiplier * factor) if factor == factor and quantity == quantity else None
+                for quantity, factor in zip(self.quantities, self.factors)]
+
+    def total_weight(self, multiplier=1.0):
+        """Return the sum of the converted lines' rounded weights at multiplier."""
+        return sum(round(quantity * multiplier * factor)
+                   for quantity, factor in zip(self.quantities, self.factors)
+                   if factor == factor and quantity == quantity)
+
+    def _sum_weights(self, flour_only=False):
+        return math.fsum(quantity * factor
+                         for quantity, factor, flour in zip(self.quantities, self.factors, self.flour)
+                         if factor == factor and quantity == quantity and (flour or not flour_only))
+
+    def multiplier_for_total(self, target_grams):
+        """Return the multiplier that brings the recipe's total weight to target_grams."""
+        if not self.exact_weight:
+            raise ValueError("recipe has no convertible lines to scale by weight")
+        return target_grams / self.exact_weight
+
+    def multiplier_for_flour(self, flour_grams):
+        """Return the multiplier that makes the recipe's flour weigh flour_grams."""
+        if not self.flour_weight:
+            raise ValueError("recipe has no convertible flour to scale by baker's percentage")
+        return flour_grams / self.flour_weight
+
+    def bakers_percentages(self):
+        """Return each line's weight as a percentage of total flour weight, or None."""
+        flour = self.flour_weight
+        if not flour:
+            raise ValueError("recipe has no convertible flour to compute baker's percentages")
+        return [quantity * factor / flour * 100 if factor == factor and quantity == quantity else None
+                for quantity, factor in zip(self.quantities, self.factors)]
+
+    def scale(self, multiplier):
+        """Return the recipe like RecipeParser.convert_lines, with quantities and weights scaled.
+
+        Each line's "original" text is left as written.
+        """
+        results = []
+        for record, quantity, weight in zip(self.records, self.quantities, self.gram_weights(multiplier)):
+            item = thaw_record(record)
+            if quantity == quantity:
+                item["quantity"] = quantity * multiplier
+            item["gram_weight"] = weight
+            results.append(item)
+        return results
+
+    def scale_to_total(self, target_grams):
+        """Return the recipe scaled so its total weight is about target_grams."""
+        return self.scale(self.multiplier_for_total(target_grams))
+
+    def scale_to_flour(self, flour_grams):
+        """Return the recipe scaled so its flour weighs flour_grams, keeping baker's percentages."""
+        return self.scale(self.multiplier_for_flour(flour_grams))
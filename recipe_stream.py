@@ -0,0 +1,82 @@
+# recipe_stream.py
+import codecs
+import io
+import mmap
+import os
+import stat
+
+
+def iter_lines(source):
+    """Yield stripped, non-empty recipe lines one at a time.
+
+    source may be a file path, an open file object or any iterable of
+    lines (str or bytes). Regular files read from the start are
+    memory-mapped and scanned in place, so only the current line is ever
+    copied out of the page cache; pipes, partly read files and text files
+    in other encodings are read line by line. Note that a plain str is
+    taken to be a path, not recipe text. Bytes that aren't valid UTF-8
+    raise UnicodeDecodeError naming the file and line.
+    """
+    if isinstance(source, (str, bytes, os.PathLike)):
+        # Paths may name a FIFO or /dev/stdin as well as a regular file
+        with open(source, "rb") as file:
+            yield from _iter_source_lines(file)
+        return
+    yield from _iter_source_lines(source)
+
+
+def _iter_source_lines(source):
+    name = getattr(source, "name", None)
+    if _can_map(source):
+        yield from _iter_mapped_lines(source, name)
+        return
+
+    # StringIO, pipes, generators, lists of lines...
+    for number, line in enumerate(source, 1):
+        if isinstance(line, bytes):
+            try:
+                line = line.decode("utf-8-sig" if number == 1 else "utf-8")
+            except UnicodeDecodeError as e:
+                raise _decode_error(e, name, number) from None
+        line = line.strip()
+        if line:
+            yield line
+
+
+def _can_map(file):
+    """Whether file is a regular UTF-8 file positioned at its start."""
+    try:
+        if not stat.S_ISREG(os.fstat(file.fileno()).st_mode) or file.tell() != 0:
+            return False
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        return False
+    encoding = getattr(file, "encoding", None)  # None for binary files
+    return encoding is None or codecs.lookup(encoding).name in ("utf-8", "utf-8-sig")
+
+
+def _decode_error(error, name, number):
+    """Return error with the file name (where known) and line number added to its reason."""
+    where = f"{name}, line {number}" if name is not None else f"line {number}"
+    return UnicodeDecodeError(error.encoding, error.object, error.start, error.end,
+                              f"{error.reason} ({where})")
+
+
+def _iter_mapped_lines(file, name=None):
+    if os.fstat(file.fileno()).st_size == 0:
+        return  # mmap can't map an empty file
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        end = len(mapped)
+        start = len(codecs.BOM_UTF8) if mapped[:3] == codecs.BOM_UTF8 else 0
+        number = 0
+        while start < end:
+            number += 1
+            newline = mapped.find(b"\n", start)
+            if newline == -1:
+                newline = end
+            try:
+                line = mapped[start:newline].decode("utf-8").strip()
+            except UnicodeDecodeError as e:
+                raise _decode_error(e, name, number) from None
+            start = newline + 1
+            if line:
+                yield line
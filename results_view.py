@@ -0,0 +1,204 @@
+# results_view.py
+import tkinter as tk
+from tkinter import ttk
+
+ROW_HEIGHT = 25
+# Height of the column headings until the Treeview has been drawn and can be asked
+HEADING_HEIGHT = 25
+
+NOTES_TEXT = """• For best results, use a digital scale with 1g precision.
+• Room temperature for ingredients is assumed to be 21°C (70°F).
+• Weight conversions are approximate and based on standard densities."""
+
+
+def row_values(item):
+    """Return the (values, tags) a converted ingredient is shown with."""
+    if item is None:
+        return ("", "", ""), ()  # blank line in live mode
+    if item.get("is_header", False):
+        return (item["original"], "", ""), ("header",)
+    gram_weight = item.get("gram_weight", None)
+    gram_str = f"{gram_weight}g" if gram_weight is not None else "N/A"
+    return (item["name"], item["original"], gram_str), ()
+
+
+def _weight(item):
+    if item is None or item.get("is_header", False):
+        return 0
+    return item.get("gram_weight") or 0
+
+
+class ResultsView:
+    """Converted-recipe table that is built once and reused for every conversion.
+
+    The Treeview is virtualized: it only ever holds as many items as fit on
+    screen, and scrolling rewrites those items from the result list. Adding
+    or replacing rows is a list splice plus an update of the visible window,
+    so rendering cost stays flat however long the recipe is.
+    """
+
+    def __init__(self, parent, on_save):
+        self.results = []
+        self.total_weight = 0
+        self.finished = False
+        self.first_row = 0
+        self._slots = []       # Treeview item ids, one per visible row
+        self._shown = []       # (values, tags) currently displayed in each slot
+        self._full_rows = 1    # rows fully visible; the last slot may be cut off
+
+        # Action buttons
+        btn_frame = ttk.Frame(parent)
+        btn_frame.pack(fill=tk.X, pady=(0, 10))
+
+        save_btn = ttk.Button(btn_frame, text="Save as CSV",
+                            command=lambda: on_save([item for item in self.results if item is not None]))
+        save_btn.pack(side=tk.RIGHT, padx=5)
+
+        # Create treeview for results
+        columns = ("ingredient", "original", "grams")
+        tree = ttk.Treeview(parent, columns=columns, show="headings", selectmode="none")
+
+        # Define column headings
+        tree.heading("ingredient", text="Ingredient")
+        tree.heading("original", text="Original Measurement")
+        tree.heading("grams", text="Weight (g)")
+
+        # Define column widths
+        tree.column("ingredient", width=150)
+        tree.column("original", width=150)
+        tree.column("grams", width=100)
+
+        # Style the treeview
+        style = ttk.Style()
+        style.configure("Treeview.Heading", font=("Helvetica", 10, "bold"))
+        style.configure("Treeview", font=("Helvetica", 10), rowheight=ROW_HEIGHT)
+        style.map("Treeview", background=[("selected", "#f0f0f0")])
+
+        # Configure tag styles
+        tree.tag_configure("header", background="#f0f0f0", font=("Helvetica", 10, "bold"))
+        tree.tag_configure("total", background="#e6e6e6", font=("Helvetica", 10, "bold"))
+
+        # The scrollbar drives the virtual window rather than the Treeview
+        scrollbar = ttk.Scrollbar(parent, orient=tk.VERTICAL, command=self._on_scrollbar)
+
+        # Pack the treeview and scrollbar
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        tree.bind("<Configure>", self._on_resize)
+        tree.bind("<MouseWheel>", self._on_mousewheel)
+        tree.bind("<Button-4>", lambda event: self._scroll_event(-3))
+        tree.bind("<Button-5>", lambda event: self._scroll_event(3))
+
+        # Notes section
+        notes_frame = ttk.LabelFrame(parent, text="Precision Baking Notes")
+        notes_frame.pack(fill=tk.X, pady=(10, 0))
+
+        ttk.Label(notes_frame, text=NOTES_TEXT, justify=tk.LEFT, wraplength=400).pack(
+            anchor=tk.W, padx=10, pady=10)
+
+        self.tree = tree
+        self.scrollbar = scrollbar
+        rows = int(str(tree.cget("height")) or 10)
+        self._full_rows = rows
+        self._set_visible_rows(rows)
+
+    def clear(self):
+        """Empty the table for a new conversion."""
+        self.results = []
+        self.total_weight = 0
+        self.finished = False
+        self.first_row = 0
+        self._refresh()
+
+    def append(self, items):
+        """Add converted ingredients to the end of the table."""
+        self.splice(len(self.results), len(self.results), items)
+
+    def splice(self, start, end, items):
+        """Replace rows start..end with items (None for a blank row).
+
+        The total weight is adjusted by the rows removed and added rather than
+        summed again, and only the visible window is redrawn.
+        """
+        for item in self.results[start:end]:
+            self.total_weight -= _weight(item)
+        for item in items:
+            self.total_weight += _weight(item)
+        self.results[start:end] = items
+        self._refresh()
+
+    def finish(self):
+        """Show the blank spacer and TOTAL WEIGHT rows after the last ingredient."""
+        self.finished = True
+        self._refresh()
+
+    def row_count(self):
+        return len(self.results) + (2 if self.finished else 0)
+
+    def scroll(self, rows):
+        self.scroll_to(self.first_row + rows)
+
+    def scroll_to(self, first_row):
+        last_start = max(0, self.row_count() - self._full_rows)
+        first_row = max(0, min(first_row, last_start))
+        if first_row != self.first_row:
+            self.first_row = first_row
+            self._refresh()
+
+    def _values_for(self, row):
+        if row < len(self.results):
+            return row_values(self.results[row])
+        if self.finished and row == len(self.results) + 1:
+            return ("TOTAL WEIGHT", "", f"{self.total_weight}g"), ("total",)
+        return ("", "", ""), ()
+
+    def _refresh(self):
+        """Write the visible window of rows into the Treeview slots that changed."""
+        for slot, item_id in enumerate(self._slots):
+            shown = self._values_for(self.first_row + slot)
+            if shown != self._shown[slot]:
+                values, tags = shown
+                self.tree.item(item_id, values=values, tags=tags)
+                self._shown[slot] = shown
+        self._update_scrollbar()
+
+    def _update_scrollbar(self):
+        total = max(self.row_count(), 1)
+        self.scrollbar.set(self.first_row / total,
+                           min(1.0, (self.first_row + self._full_rows) / total))
+
+    def _set_visible_rows(self, count):
+        count = max(1, count)
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert("", tk.END, values=("", "", "")))
+            self._shown.append((("", "", ""), ()))
+        while len(self._slots) > count:
+            self.tree.delete(self._slots.pop())
+            self._shown.pop()
+        self.scroll_to(self.first_row)
+        self._refresh()
+
+    def _on_resize(self, event):
+        # The first slot never scrolls inside the Treeview, so its top is the heading's height
+        bbox = self.tree.bbox(self._slots[0]) if self._slots else None
+        heading = bbox[1] if bbox else HEADING_HEIGHT
+        self._full_rows = max(1, (event.height - heading) // ROW_HEIGHT)
+        # Rows that fit below the heading, plus one for a partly visible last row
+        self._set_visible_rows(self._full_rows + 1)
+
+    def _on_mousewheel(self, event):
+        return self._scroll_event(-3 if event.delta > 0 else 3)
+
+    def _scroll_event(self, rows):
+        # "break" stops the Treeview's own binding from scrolling its items
+        # out of line with the virtual window
+        self.scroll(rows)
+        return "break"
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        if action == "moveto":
+            self.scroll_to(int(float(amount) * self.row_count()))
+        elif action == "scroll":
+            step = self._full_rows if unit == "pages" else 1
+            self.scroll(int(amount) * step)
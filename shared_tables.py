@@ -0,0 +1,105 @@
+# shared_tables.py
+from contextlib import contextmanager
+from multiprocessing import resource_tracker, shared_memory
+import os
+import sys
+
+from ingredient_snapshot import SnapshotTable, build_snapshot
+
+
+class SharedTables:
+    """An ingredient snapshot (see ingredient_snapshot) placed once in a shared memory block.
+
+    The creating process owns the block: close() unlinks it, as does the
+    resource tracker if the owner dies without closing. Worker processes
+    call attach_table(name) for a read-only SnapshotTable over the same
+    pages, so the numeric columns, name indexes and matcher automaton exist
+    once however many workers there are.
+    """
+
+    def __init__(self, data):
+        self._memory = shared_memory.SharedMemory(create=True, size=len(data))
+        self._memory.buf[:len(data)] = data
+        self.name = self._memory.name
+        self.size = len(data)
+
+    @classmethod
+    def from_database(cls, ingredient_database):
+        return cls(build_snapshot(ingredient_database))
+
+    @classmethod
+    def from_snapshot(cls, path):
+        with open(path, "rb") as file:
+            return cls(file.read())
+
+    def close(self):
+        """Unmap and unlink the block; tables attached elsewhere stay valid until they detach."""
+        if self._memory is not None:
+            self._memory.close()
+            self._memory.unlink()
+            self._memory = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class _AttachedMemory(shared_memory.SharedMemory):
+    """A SharedMemory attached for a SnapshotTable, whose views may outlive it.
+
+    SharedMemory.__del__ closes the mapping, which fails while views into
+    it exist (as at interpreter exit); the mapping is freed with its last
+    view instead.
+    """
+
+    def __del__(self):
+        pass
+
+
+@contextmanager
+def _untracked():
+    # Before Python 3.13 every SharedMemory registers with a resource
+    # tracker, so an attaching process with its own tracker would unlink
+    # the owner's block when it exits.
+    register = resource_tracker.register
+    resource_tracker.register = lambda name, rtype: None
+    try:
+        yield
+    finally:
+        resource_tracker.register = register
+
+
+def attach_table(name):
+    """Return a read-only SnapshotTable over the shared block name, without copying it."""
+    if sys.version_info >= (3, 13):
+        memory = _AttachedMemory(name=name, track=False)
+    else:
+        with _untracked():
+            memory = _AttachedMemory(name=name)
+    table = SnapshotTable(memory.buf.toreadonly())
+    # The block stays mapped for as long as the table is alive
+    table.shared_memory = memory
+    return table
+
+
+def process_memory():
+    """Return this process's resident memory in bytes as {"rss", "private", "shared"} (Linux), or {}.
+
+    private is anonymous memory (the heap); shared is file-backed and shared
+    memory pages, which other processes mapping them don't pay for again.
+    """
+    fields = {}
+    try:
+        with open(f"/proc/{os.getpid()}/status") as file:
+            for line in file:
+                key, _, value = line.partition(":")
+                if key in ("VmRSS", "RssAnon", "RssFile", "RssShmem"):
+                    fields[key] = int(value.split()[0]) * 1024
+    except (OSError, ValueError):
+        return {}
+    if "VmRSS" not in fields:
+        return {}
+    return {"rss": fields["VmRSS"], "private": fields.get("RssAnon", 0),
+            "shared": fields.get("RssFile", 0) + fields.get("RssShmem", 0)}
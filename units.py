@@ -0,0 +1,105 @@
+# units.py
+from collections import namedtuple
+from types import MappingProxyType
+
+OUNCE_GRAMS = 28.35  # 1 oz = 28.35g
+POUND_GRAMS = 453.59  # 1 lb = 453.59g
+
+# A unit is factor times a basis measurement. The basis is either a fixed
+# weight ("gram") or one of the measurements each ingredient carries: grams
+# per cup, tablespoon or teaspoon, its density per milliliter, or grams per
+# item ("each", e.g. 50g per egg).
+Unit = namedtuple("Unit", ["name", "basis", "factor"])
+
+# Canonical unit names. A unit's position in this tuple is its unit id in
+# the batch conversion factor matrix, so new units go at the end. "each" is
+# used for countable items such as eggs, where the recipe gives no unit.
+CANONICAL_UNITS = ("gram", "cup", "tablespoon", "teaspoon", "ounce", "pound", "milliliter", "each",
+                   "kilogram", "milligram", "liter", "deciliter", "fluid ounce", "pint", "quart",
+                   "stick", "pinch")
+
+UNITS = MappingProxyType({unit.name: unit for unit in (
+    Unit("gram", "gram", 1.0),
+    Unit("cup", "cup", 1),
+    Unit("tablespoon", "tablespoon", 1),
+    Unit("teaspoon", "teaspoon", 1),
+    Unit("ounce", "gram", OUNCE_GRAMS),
+    Unit("pound", "gram", POUND_GRAMS),
+    Unit("milliliter", "milliliter", 1),
+    Unit("each", "each", 1),
+    Unit("kilogram", "gram", 1000.0),
+    Unit("milligram", "gram", 0.001),
+    Unit("liter", "milliliter", 1000),
+    Unit("deciliter", "milliliter", 100),
+    Unit("fluid ounce", "tablespoon", 2),  # US: 1 fl oz = 2 tbsp
+    Unit("pint", "cup", 2),  # US: 1 pint = 2 cups
+    Unit("quart", "cup", 4),  # US: 1 quart = 4 cups
+    Unit("stick", "tablespoon", 8),  # 1 stick of butter = 8 tbsp
+    Unit("pinch", "teaspoon", 1 / 16),
+)})
+
+_ALIASES = {
+    "gram": ["g", "gr", "gram", "grams", "gramme", "grammes"],
+    "cup": ["c", "cup", "cups"],
+    "tablespoon": ["tbsp", "tbsps", "tbs", "tblsp", "tablespoon", "tablespoons"],
+    "teaspoon": ["tsp", "tsps", "teaspoon", "teaspoons"],
+    "ounce": ["oz", "ozs", "ounce", "ounces"],
+    "pound": ["lb", "lbs", "pound", "pounds"],
+    "milliliter": ["ml", "mls", "milliliter", "milliliters", "millilitre", "millilitres"],
+    "kilogram": ["kg", "kgs", "kilo", "kilos", "kilogram", "kilograms"],
+    "milligram": ["mg", "milligram", "milligrams"],
+    "liter": ["l", "liter", "liters", "litre", "litres"],
+    "deciliter": ["dl", "deciliter", "deciliters", "decilitre", "decilitres"],
+    "fluid ounce": ["fl oz", "fl. oz", "floz", "fluid ounce", "fluid ounces"],
+    "pint": ["pt", "pint", "pints"],
+    "quart": ["qt", "quart", "quarts"],
+    "stick": ["stick", "sticks"],
+    "pinch": ["pinch", "pinches"],
+}
+
+# Every spelling, abbreviation and plural, in lower, upper and title case, so
+# resolving a unit is a single dict lookup. Other casings fall back to lower().
+UNIT_ALIASES = MappingProxyType({
+    variant: name
+    for name, aliases in _ALIASES.items()
+    for alias in aliases
+    for variant in (alias, alias.upper(), alias.title())
+})
+
+
+def canonical_unit(unit):
+    """Return the canonical name for a parsed unit, or None if it is unknown."""
+    if unit is None:
+        return "each"
+    name = UNIT_ALIASES.get(unit)
+    if name is None:
+        name = UNIT_ALIASES.get(" ".join(unit.lower().split()))
+    return name
+
+
+def is_unit(word):
+    """Return True if word is a known unit name, abbreviation or plural."""
+    return word in UNIT_ALIASES or word.lower() in UNIT_ALIASES
+
+
+def _basis_grams(ingredient_data, basis):
+    if basis == "gram":
+        return 1.0
+    elif basis == "milliliter":
+        if ingredient_data["type"] == "liquid":
+            return 1.0  # 1ml of water = 1g
+        return ingredient_data.get("density", 1)
+    elif basis == "each":
+        return ingredient_data.get("gram_per_unit")  # e.g. 50g per egg
+    return ingredient_data.get(f"gram_per_{basis}", 0)
+
+
+def conversion_factor(ingredient_data, unit):
+    """Return grams per one canonical unit of an ingredient, or None if not convertible."""
+    record = UNITS.get(unit)
+    if record is None:
+        return None
+    grams = _basis_grams(ingredient_data, record.basis)
+    if grams is None:
+        return None
+    return grams * record.factor